@@ -6,30 +6,30 @@ from .core.timeit import timeit  # noqa
 from .core import tools  # noqa
 from .core.tools import html2 as html  # noqa
 
-# from . import data  # noqa
-from .data import get_data, get_image, geo_plot, generate_header_links, DataParser  # noqa
-
 from .core.gpt import ask_chat_gpt, ask_dall_e  # noqa
-from .core.equals import is_equal  # noqa
+from .core.equals import is_equal, is_equal_many  # noqa
 
 from .core import colors as c  # noqa
 
 from .core import installer  # noqa
-from . import admin  # noqa
-from . import ml  # noqa
-from . import rl  # noqa
-from . import hpc  # noqa
-from . import ecox  # noqa
-from . import beaut  # noqa
-from . import boids  # noqa
-from . import phyu  # noqa
-from .phyu.constants import constants  # noqa
-from .phyu.formulas import formulas  # noqa
-
-from .ecox.trading import *  # noqa
 
 from .core.logins import init_env  # noqa
 
+# The subpackages (and their heavy dependencies: torch, statsmodels, pygame, bs4...) are imported at first access
+__getattr__, __dir__ = tools.lazy_loader(
+    __name__,
+    submodules=["data", "admin", "ml", "rl", "hpc", "ecox", "beaut", "boids", "phyu"],
+    attributes={
+        **{k: "data" for k in ["get_data", "get_image", "geo_plot", "generate_header_links", "DataParser"]},
+        "constants": "phyu.constants",
+        "formulas": "phyu.formulas",
+        **{
+            k: "ecox.trading"
+            for k in ["get_test_data", "Sampler", "display_sharpe_ratios", "get_pnls", "check_outsample", "build_pnls"]
+        },
+    },
+)
+
 if ipp := IPython.get_ipython():
     from .core.evaluation import Evaluation
     from .hpc.compiler import CCPPlugin
@@ -1,12 +1,32 @@
 import os
 import json
+import datetime
 
 
 from .. import core
 from . import tools
+from .gradebook import Gradebook
 
+# Overlap of the incremental fetches (seconds): the update_time of the answers are stamped by the students kernels
+MARK_OVERLAP = 3600
 
-def get_answers(cell_id, refresh=True, update_git=False, verbose=False):
+
+def get_mark(filename):
+    """Start of the last fetch (clock of this kernel) minus MARK_OVERLAP, None before the first incremental fetch"""
+    if not os.path.exists(markname := filename + ".mark"):
+        return None
+    with open(markname) as mark_file:
+        mark = datetime.datetime.strptime(mark_file.read().strip(), "%Y-%m-%d %H:%M:%S")
+    return (mark - datetime.timedelta(seconds=MARK_OVERLAP)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def get_answers(cell_id, refresh=True, update_git=False, verbose=False, incremental=False):
+    """Return the answers {user: data} of a cell, cached in data/cache/{subject}/{virtual_room}.
+
+    :param incremental: only fetch the documents updated since the last fetch (with an overlap of MARK_OVERLAP
+      seconds), and patch the cache file (deleted documents are only removed by a full synchronisation)
+    :param refresh: for a full synchronisation, do not merge the documents with the cached answers
+    """
     config = core.tools.get_config()
     cinfo = core.tools.get_config(is_namespace=True)
     virtual_room, subject, notebook_id = (config.get(v) for v in ["virtual_room", "subject", "notebook_id"])
@@ -17,15 +37,24 @@ def get_answers(cell_id, refresh=True, update_git=False, verbose=False):
     filename = core.tools.abspath(
         f"data/cache/{subject}/{virtual_room}/admin_{notebook_id}_{cell_id}.json", create_dir=True
     )
-    if os.path.exists(filename) and not refresh:
+    if os.path.exists(filename) and (incremental or not refresh):
         with open(filename) as json_file:
             cdata = json.load(json_file)
 
-    docs = core.firebase.get_collection(cell_id, cinfo=cinfo).stream()
+    collection = core.firebase.get_collection(cell_id, cinfo=cinfo)
+    fetch_time = core.firebase.get_update_time()
+    if incremental and len(cdata) > 0 and (mark := get_mark(filename)) is not None:
+        # The documents of the overlap are fetched again, and skipped if already cached
+        docs, data = collection.where("update_time", ">=", mark).stream(), cdata
+    else:
+        docs, data = collection.stream(), {}
 
-    data = {}
+    is_updated = len(data) == 0
     for answer in docs:
-        student_id = answer.id
+        student_id, answer_data = answer.id, answer.to_dict()
+        if data is cdata and student_id in cdata and answer_data.items() <= cdata[student_id].items():
+            continue  # Already cached (dedupe by document id)
+        is_updated = True
         if students_list.query(f"mail == '{student_id}'").empty:
             print(
                 f"'\x1b[41mL'étudiant {student_id} est inconnu. Ajouter le depuis le menu dashboard:\nbulkhours.admin.dashboard()\x1b[0m"
@@ -34,25 +63,32 @@ def get_answers(cell_id, refresh=True, update_git=False, verbose=False):
             )
 
         if student_id in cdata:
-            cdata[student_id].update(answer.to_dict())
+            cdata[student_id].update(answer_data)
         else:
-            cdata[student_id] = answer.to_dict()
+            cdata[student_id] = answer_data
 
         if "note" not in cdata[student_id]:
             cdata[student_id]["note"] = 0
 
         data[student_id] = cdata[student_id]
 
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    if is_updated:
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+        if Gradebook.is_available():
+            Gradebook(config).update(cell_id, data)
+    with open(filename + ".mark", "w") as mark_file:
+        mark_file.write(fetch_time)
     tools.update_github(update_git, msg=f"Cache file ({filename}) of {cell_id}", verbose=verbose)
 
     return data
 
 
 def update_note(cell_id, user, note, verbose=True):
-    import datetime
+    return update_notes(cell_id, {user: note}, verbose=verbose)
+
 
+def update_notes(cell_id, notes, verbose=True):
     config = core.tools.get_config()
     cinfo = core.tools.get_config(is_namespace=True)
     virtual_room, subject, notebook_id = (config.get(v) for v in ["virtual_room", "subject", "notebook_id"])
@@ -67,35 +103,45 @@ def update_note(cell_id, user, note, verbose=True):
         with open(filename) as json_file:
             data = json.load(json_file)
 
-    uptime = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    uptime = core.firebase.get_update_time()
+    batch = core.firebase.DbClient().batch()
 
-    if do_create_data := user not in data:
-        data[user] = {}
+    for i, (user, note) in enumerate(notes.items()):
+        if i > 0 and i % 500 == 0:  # Firestore batches are limited to 500 writes
+            batch.commit()
+            batch = core.firebase.DbClient().batch()
 
-    if "note" in data[user]:
-        cmd = (
-            f"Pour {cell_id}/{user}, mise à jour de la note de {data[user]['note']} à {note} ({uptime})"
-            if language == "fr"
-            else f"For {cell_id}/{user}, update note from {data[user]['note']} to {note} ({uptime})"
-        )
+        if do_create_data := user not in data:
+            data[user] = {}
 
-    else:
-        cmd = (
-            f"Pour {cell_id}/{user}, mise à jour de la à {note} ({uptime})"
-            if language == "fr"
-            else f"For {cell_id}/{user}, set note from to {note} at {uptime}"
-        )
+        if "note" in data[user]:
+            cmd = (
+                f"Pour {cell_id}/{user}, mise à jour de la note de {data[user]['note']} à {note} ({uptime})"
+                if language == "fr"
+                else f"For {cell_id}/{user}, update note from {data[user]['note']} to {note} ({uptime})"
+            )
+
+        else:
+            cmd = (
+                f"Pour {cell_id}/{user}, mise à jour de la à {note} ({uptime})"
+                if language == "fr"
+                else f"For {cell_id}/{user}, set note from to {note} at {uptime}"
+            )
+
+        if verbose:
+            print(f"\x1b[35m\x1b[1m{cmd}\x1b[m")
 
-    if verbose:
-        print(f"\x1b[35m\x1b[1m{cmd}\x1b[m")
+        data[user]["note"] = note
+        document = core.firebase.get_document(question=cell_id, user=user, cinfo=cinfo)
+        if do_create_data:
+            batch.set(document, {"note": note, "update_time": uptime})
+        else:
+            batch.update(document, {"note": note, "update_time": uptime})
 
-    data[user]["note"] = note
+    # A single write of the cache file and of the database for all the notes
     with open(filename, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=4)
+    if Gradebook.is_available():
+        Gradebook(config).update(cell_id, data)
 
-    if do_create_data:
-        return core.firebase.get_document(question=cell_id, user=user, cinfo=cinfo).set(
-            {"note": note, "update_time": uptime}
-        )
-    else:
-        return core.firebase.get_document(question=cell_id, user=user, cinfo=cinfo).update({"note": note})
+    return batch.commit()
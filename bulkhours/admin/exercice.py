@@ -25,16 +25,27 @@ class Exercices:
         self.course_info = course_info
         self.config = config
         self.exercices = {u: {e: Exercice(u, e) for e in exos} for u in users}
+        self.table = None
 
     def update_data(self, user, exo, adata) -> None:
         self.exercices[user][exo].update_data(adata)
 
-    def get_dataframe(self, field, suffix=""):
-        data = pd.DataFrame(
-            {e + suffix: [getattr(self.exercices[u][e], field) for u in self.users] for e in self.exos},
-            index=self.users,
+    def update_table(self, table) -> None:
+        """Use the gradebook table (one row per user and exercice) instead of the Exercice objects"""
+        self.table = table
+
+    def get_values(self, field):
+        if self.table is not None:
+            values = self.table.pivot(index="user", columns="exercice", values=field)
+            return values.reindex(index=self.users, columns=self.exos).rename_axis(index=None, columns=None)
+
+        return pd.DataFrame(
+            {e: [getattr(self.exercices[u][e], field) for u in self.users] for e in self.exos}, index=self.users
         )
 
+    def get_dataframe(self, field, suffix=""):
+        data = self.get_values(field).rename(columns=lambda e: e + suffix)
+
         if field == "time":
             for c in data.columns:
                 ts = pd.to_datetime(data[c])
@@ -0,0 +1,64 @@
+import os
+import numpy as np
+import pandas as pd
+
+from .. import core
+
+
+class Gradebook:
+    """Notes of a notebook stored as a parquet table (one row per user and exercice) next to the answers cache:
+    data/cache/{subject}/{virtual_room}/gradebook_{notebook_id}.parquet
+    """
+
+    columns = ["exercice", "user", "count", "time", "note"]
+
+    def __init__(self, config=None) -> None:
+        config = core.tools.get_config() if config is None else config
+        virtual_room, subject, notebook_id = (config.get(v) for v in ["virtual_room", "subject", "notebook_id"])
+
+        self.filename = core.tools.abspath(
+            f"data/cache/{subject}/{virtual_room}/gradebook_{notebook_id}.parquet", create_dir=True
+        )
+
+    @staticmethod
+    def is_available():
+        try:
+            import pyarrow  # noqa
+
+            return True
+        except ImportError:
+            return False
+
+    def exists(self):
+        return os.path.exists(self.filename)
+
+    def load(self, exos=None):
+        if not self.exists():
+            return pd.DataFrame(columns=Gradebook.columns)
+
+        return pd.read_parquet(self.filename, filters=None if exos is None else [("exercice", "in", list(exos))])
+
+    @staticmethod
+    def get_rows(exo, answers):
+        rows = []
+        for user, adata in answers.items():
+            note = adata.get("note", np.nan)
+            rows.append(
+                {
+                    "exercice": exo,
+                    "user": user,
+                    "count": 1.0,
+                    "time": adata.get("update_time"),
+                    "note": -2.0 if note is None else float(note),  # -2: failure of automatic grades
+                }
+            )
+        return pd.DataFrame(rows, columns=Gradebook.columns)
+
+    def update(self, exo, answers) -> None:
+        """Replace the rows of one exercice by its cached answers {user: data}"""
+        table = self.load()
+        table = pd.concat([table[table["exercice"] != exo], Gradebook.get_rows(exo, answers)], ignore_index=True)
+        table = table.astype({"exercice": str, "user": str, "count": np.float64, "time": object, "note": np.float64})
+
+        table.to_parquet(tmpname := self.filename + ".tmp", index=False)
+        os.replace(tmpname, self.filename)
@@ -1,6 +1,7 @@
 import json
 from .. import core
 from .exercice import Exercices, Exercice
+from .gradebook import Gradebook
 from . import tools
 
 
@@ -45,21 +46,38 @@ def summary(
     data = tools.get_users_list(no_admin=no_admin)
     exercices = Exercices(users := list(data.mail.unique()), exos, course_info, config)
 
-    for exo in exos:
+    def get_cached_answers(exo):
         filename = core.tools.abspath(
             f"data/cache/{subject}/{virtual_room}/admin_{notebook_id}_{exo}.json", create_dir=True
         )
-
         with open(filename) as json_file:
-            answers = json.load(json_file)
-
-            for user, adata in answers.items():
-                if user not in users:
-                    print(
-                        f"\x1b[41mL'étudiant {user} est inconnu. Ajouter le depuis le menu dashboard:\nbulkhours.admin.dashboard()\x1b[0m"
-                        if language == "fr"
-                        else f"\x1b[41mStudent {user} is unknown. Please declare it in the dashboard: bulkhours.admin.dashboard()\x1b[0m"
-                    )
+            return json.load(json_file)
+
+    def check_user(user):
+        if user not in users:
+            print(
+                f"\x1b[41mL'étudiant {user} est inconnu. Ajouter le depuis le menu dashboard:\nbulkhours.admin.dashboard()\x1b[0m"
+                if language == "fr"
+                else f"\x1b[41mStudent {user} is unknown. Please declare it in the dashboard: bulkhours.admin.dashboard()\x1b[0m"
+            )
+
+    if Gradebook.is_available():
+        gradebook = Gradebook(config)
+        table = gradebook.load(exos=exos)
+        # Exercices cached before the gradebook existed
+        cached_exos = set(table["exercice"])
+        if len(missing_exos := [exo for exo in exos if exo not in cached_exos]) > 0:
+            for exo in missing_exos:
+                gradebook.update(exo, get_cached_answers(exo))
+            table = gradebook.load(exos=exos)
+
+        for user in table["user"].unique():
+            check_user(user)
+        exercices.update_table(table)
+    else:
+        for exo in exos:
+            for user, adata in get_cached_answers(exo).items():
+                check_user(user)
                 exercices.update_data(user, exo, adata)
 
     if cinfo in ["", "A"]:
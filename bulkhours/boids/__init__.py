@@ -1,3 +1,14 @@
-from .pltboido import BoidO, animate_boid  # noqa
-from .pltshape import Shape  # noqa
-from .pltboid import Boid  # noqa
+from ..core import tools
+
+__getattr__, __dir__ = tools.lazy_loader(
+    __name__,
+    submodules=["pltboido", "pltshape", "pltboid", "simulation", "flock", "headless"],
+    attributes={
+        "BoidO": "pltboido",
+        "animate_boid": "pltboido",
+        "Shape": "pltshape",
+        "Boid": "pltboid",
+        "Flock": "flock",
+        "HeadlessSimulation": "headless",
+    },
+)
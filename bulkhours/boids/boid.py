@@ -10,13 +10,16 @@ class Boid(pygame.sprite.DirtySprite):
 
     width = None
     height = None
+    images = {}  # Loaded once per file for all the boids
 
     def __init__(self, x, y, cohesion_weight, alignment_weight, separation_weight,
                  obstacle_avoidance_weight, goal_weight, field_of_view, max_speed, image):
         pygame.sprite.DirtySprite.__init__(self)
 
         # Load image as sprite
-        self.image = pygame.image.load(image).convert_alpha()
+        if image not in Boid.images:
+            Boid.images[image] = pygame.image.load(image).convert_alpha()
+        self.image = Boid.images[image]
 
         # Fetch the rectangle object that has the dimensions of the image
         self.rect = self.image.get_rect()
@@ -0,0 +1,187 @@
+import numpy as np
+
+from . import neighbors
+
+
+class Flock:
+    """Boids stored as arrays: positions (top left corner of the sprite) and velocities are (N, 2) float arrays.
+    The rules of boid.Boid (cohesion, alignment, separation, obstacle avoidance, flee, attack) are applied to the
+    whole flock with NumPy operations on the adjacency matrix of the neighbors (found by a KD-tree). All the boids
+    of a step see the same state of the flock (the sprites were moved one after the other).
+    Each boid keeps its id (row of the recorded trajectories) when other boids are removed.
+    """
+
+    width, height = 1024, 768  # Default screen size
+    max_dense = 400  # Smaller flocks compare all the pairs (faster than building a KD-tree)
+
+    def __init__(
+        self,
+        positions,
+        velocities=None,
+        cohesion_weight=100,
+        alignment_weight=40,
+        separation_weight=5,
+        obstacle_avoidance_weight=10,
+        goal_weight=100,
+        field_of_view=200,
+        max_speed=8,
+        size=(10, 10),
+        rng=None,
+        width=None,
+        height=None,
+        dt=1.0,
+    ) -> None:
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.positions = np.array(positions, dtype=float).reshape(-1, 2)
+        self.velocities = self.get_velocities(len(self.positions)) if velocities is None else velocities
+        self.velocities = np.array(self.velocities, dtype=float).reshape(-1, 2)
+        self.ids, self.nids = np.arange(len(self.positions)), len(self.positions)
+        self.width, self.height, self.dt = width or Flock.width, height or Flock.height, dt
+
+        self.cohesion_weight, self.alignment_weight = cohesion_weight, alignment_weight
+        self.separation_weight, self.obstacle_avoidance_weight = separation_weight, obstacle_avoidance_weight
+        self.goal_weight, self.field_of_view, self.max_speed = goal_weight, field_of_view, max_speed
+        self.size = np.array(size, dtype=float)  # Sprite size, used for the collisions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def get_velocities(self, n):
+        return self.rng.integers(1, 11, size=(n, 2)) / 10.0
+
+    def add(self, positions, velocities=None) -> None:
+        positions = np.array(positions, dtype=float).reshape(-1, 2)
+        velocities = self.get_velocities(len(positions)) if velocities is None else velocities
+        self.ids = np.concatenate([self.ids, np.arange(self.nids, self.nids + len(positions))])
+        self.nids += len(positions)
+        self.positions = np.concatenate([self.positions, positions])
+        self.velocities = np.concatenate([self.velocities, np.array(velocities, dtype=float).reshape(-1, 2)])
+
+    def remove(self, index) -> None:
+        """Remove the boids of index (boolean mask or integer indices)"""
+        keep = np.ones(len(self), dtype=bool)
+        keep[index] = False
+        self.positions, self.velocities, self.ids = self.positions[keep], self.velocities[keep], self.ids[keep]
+
+    def get_neighbors(self, min_distance):
+        """Adjacency matrices of the boids in the field of view and of the boids closer than min_distance (without
+        the boid itself): dense arrays for small flocks, sparse matrices built from the pairs of a KD-tree otherwise
+        """
+        if len(self) <= Flock.max_dense:
+            distances2 = ((self.positions[:, None, :] - self.positions[None, :, :]) ** 2).sum(axis=2)
+            np.fill_diagonal(distances2, np.inf)
+            return (distances2 < self.field_of_view**2).astype(float), (distances2 < min_distance**2).astype(float)
+
+        from scipy import sparse
+
+        i, j = neighbors.get_pairs(self.positions, self.field_of_view)
+        close = ((self.positions[i] - self.positions[j]) ** 2).sum(axis=1) < min_distance**2
+
+        matrices = []
+        for visible in [slice(None), close]:
+            data = np.ones(len(i[visible]))
+            matrices.append(sparse.csr_matrix((data, (i[visible], j[visible])), shape=(len(self), len(self))))
+        return matrices
+
+    def get_distances(self, others):
+        """(N, M) distances between the boids and M other positions"""
+        return np.sqrt(((self.positions[:, None, :] - np.asarray(others, dtype=float)[None, :, :]) ** 2).sum(axis=2))
+
+    def flock(self, min_distance=20) -> None:
+        """Cohesion, alignment and separation with the boids in the field of view"""
+        p, v = self.positions, self.velocities
+        visible, close = self.get_neighbors(min_distance)
+        counts = np.asarray(visible.sum(axis=1)).reshape(-1, 1)
+        seen = counts[:, 0] > 0
+
+        # Cohesion (center of mass of the visible boids), alignment (their average velocity) and separation
+        center, alignment = (visible @ p)[seen] / counts[seen], (visible @ v)[seen] / counts[seen]
+        separation = np.asarray(close.sum(axis=1)).reshape(-1, 1) * p - close @ p
+        v[seen] += (center - p[seen]) / self.cohesion_weight + alignment / self.alignment_weight
+        v += separation / self.separation_weight
+
+    def avoid_obstacles(self, obstacles, size=30) -> None:
+        """obstacles: (M, 2) positions (top left corner, like the boids) of square obstacles, avoided from their center
+        one after the other
+        """
+        if obstacles is None or len(obstacles) == 0:
+            return
+
+        obstacles = np.asarray(obstacles, dtype=float)
+        for obstacle, distance in zip(obstacles, self.get_distances(obstacles).T):
+            away = self.positions - (obstacle + size / 2)
+            visible, collision = distance <= self.field_of_view, distance < 45
+            self.velocities[visible & collision] = away[visible & collision]
+            self.velocities[visible & ~collision] += away[visible & ~collision] / self.obstacle_avoidance_weight
+
+    def flee(self, predators):
+        """Boids with a predator in the field of view move away from the projected position of the nearest one"""
+        if predators is None or len(predators) == 0:
+            return np.zeros(len(self), dtype=bool)
+
+        distances = self.get_distances(predators.positions)
+        fleeing = (distances < self.field_of_view).any(axis=1)
+        nearest = distances[fleeing].argmin(axis=1)
+        target = predators.positions[nearest] + 2 * predators.velocities[nearest]
+
+        scale = self.rng.integers(1, 3, size=(fleeing.sum(), 2))
+        self.velocities[fleeing] -= (target - self.positions[fleeing]) / self.obstacle_avoidance_weight * scale
+        return fleeing
+
+    def attack(self, prey) -> None:
+        """Predators move towards the projected position of the first prey in their field of view"""
+        hunting = np.zeros(len(self), dtype=bool)
+        if prey is not None and len(prey) > 0:
+            visible = prey.get_distances(self.positions).T < self.field_of_view
+            hunting = visible.any(axis=1)
+            first = visible[hunting].argmax(axis=1)
+            target = prey.positions[first] + 2 * prey.velocities[first]
+            self.velocities[hunting] += (target - self.positions[hunting]) / self.goal_weight
+
+        self.go_to_middle(~hunting)
+
+    def go_to_middle(self, mask=slice(None)) -> None:
+        self.velocities[mask] += (np.array([self.width, self.height]) / 2 - self.positions[mask]) / 150
+
+    def limit_speed(self) -> None:
+        speed = np.sqrt((self.velocities**2).sum(axis=1))
+        fast = speed > self.max_speed
+        self.velocities[fast] *= (self.max_speed / speed[fast])[:, None]
+
+    def update(self, wrap=True) -> None:
+        """Move the boids: they reappear on the other side (wrap) or bounce off the walls"""
+        p, v, size = self.positions, self.velocities, np.array([self.width, self.height], dtype=float)
+        if wrap:
+            p[:] = np.where((p < 0) & (v < 0), size, p)
+            p[:] = np.where((p > size) & (v > 0), 0, p)
+        else:
+            bounce = ((p < 0) & (v < 0)) | ((p > size) & (v > 0))
+            v[bounce] *= -self.rng.random(bounce.sum())
+
+        # Go to middle if the boid is not moving much
+        self.go_to_middle(np.sqrt((v**2).sum(axis=1)) < 2)
+        self.limit_speed()
+        p += v * self.dt
+
+    def steer(self, predators=None, obstacles=None) -> None:
+        self.flock()
+        self.avoid_obstacles(obstacles)
+        self.go_to_middle(~self.flee(predators))
+
+    def step(self, predators=None, obstacles=None, wrap=True) -> None:
+        """One step of a flock of prey"""
+        self.steer(predators, obstacles)
+        self.update(wrap)
+
+    def hunt(self, prey, wrap=True):
+        """One step of a flock of predators: return the number of prey caught (removed from prey)"""
+        self.flock()
+        self.attack(prey)
+        self.update(wrap)
+
+        if prey is None or len(prey) == 0 or len(self) == 0:
+            return 0
+        delta = prey.positions[:, None, :] - self.positions[None, :, :]
+        caught = ((delta < self.size) & (-delta < prey.size)).all(axis=2).any(axis=1)
+        prey.remove(caught)
+        return int(caught.sum())
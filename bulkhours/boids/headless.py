@@ -0,0 +1,82 @@
+import numpy as np
+
+from .flock import Flock
+
+
+class HeadlessSimulation:
+    """Boids, predators and obstacles of the pygame simulation, stepped without display nor frame rate limit.
+    All the randomness comes from seed: a run is reproducible (tests, benchmarks). The trajectories are recorded
+    in a npz file (float32 arrays, NaN after a boid is caught) which can be replayed with pygame or matplotlib.
+    """
+
+    def __init__(
+        self, nboids=70, npredators=5, nobstacles=3, width=1024, height=768, seed=0, dt=1.0, wrap=True, border=30
+    ) -> None:
+        self.rng, self.seed, self.wrap, self.caught = np.random.default_rng(seed), seed, wrap, 0
+        self.width, self.height = width, height
+        kwargs = dict(field_of_view=70, max_speed=88, width=width, height=height, dt=dt, rng=self.rng)
+
+        # Same settings as bulkhours-boids: each flock starts from one point
+        start = self.rng.integers(0, [width, height], endpoint=True)
+        self.boids = Flock([start] * nboids, obstacle_avoidance_weight=15, goal_weight=0, **kwargs)
+        start = self.rng.integers(border, [width - border, height - border], endpoint=True)
+        self.predators = Flock([start] * npredators, obstacle_avoidance_weight=0, goal_weight=50, **kwargs)
+        self.obstacles = self.rng.integers(border, [width - border, height - border], (nobstacles, 2), endpoint=True)
+
+    def step(self) -> None:
+        self.boids.step(self.predators, self.obstacles, self.wrap)
+        self.caught += self.predators.hunt(self.boids, self.wrap)
+
+    @staticmethod
+    def get_states(flock, n):
+        """(n, 4) array of the positions and velocities by boid id"""
+        states = np.full((n, 4), np.nan, dtype=np.float32)
+        states[flock.ids] = np.concatenate([flock.positions, flock.velocities], axis=1)
+        return states
+
+    def run(self, nsteps, filename=None):
+        """Run nsteps steps and return the trajectories (saved in filename if given): boids and predators are
+        (nsteps + 1, n, 4) arrays of x, y, vx, vy
+        """
+        nboids, npredators = self.boids.nids, self.predators.nids
+        boids = np.empty((nsteps + 1, nboids, 4), dtype=np.float32)
+        predators = np.empty((nsteps + 1, npredators, 4), dtype=np.float32)
+
+        boids[0], predators[0] = self.get_states(self.boids, nboids), self.get_states(self.predators, npredators)
+        for t in range(1, nsteps + 1):
+            self.step()
+            boids[t], predators[t] = self.get_states(self.boids, nboids), self.get_states(self.predators, npredators)
+
+        trajectory = dict(boids=boids, predators=predators, obstacles=self.obstacles, size=[self.width, self.height])
+        if filename is not None:
+            np.savez(filename, seed=self.seed, **trajectory)
+        return trajectory
+
+
+def load_trajectory(filename):
+    """Trajectory saved by HeadlessSimulation.run"""
+    with np.load(filename) as data:
+        return {k: data[k] for k in data.files}
+
+
+def animate_trajectory(trajectory, interval=20, figsize=(8, 6)):
+    """matplotlib animation of a recorded trajectory (dict or npz filename)"""
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+
+    trajectory = load_trajectory(trajectory) if isinstance(trajectory, str) else trajectory
+    boids, predators = trajectory["boids"], trajectory["predators"]
+
+    fig, ax = plt.subplots(figsize=figsize)
+    ax.set_xlim(0, trajectory["size"][0]), ax.set_ylim(trajectory["size"][1], 0)
+    ax.scatter(*np.asarray(trajectory["obstacles"], dtype=float).T + 15, marker="s", s=80, color="red")
+    boid_points = ax.scatter(*boids[0, :, :2].T, s=4, color="black")
+    predator_points = ax.scatter(*predators[0, :, :2].T, s=16, color="orange")
+    plt.close(fig)
+
+    def update(t):
+        boid_points.set_offsets(boids[t, :, :2])
+        predator_points.set_offsets(predators[t, :, :2])
+        return boid_points, predator_points
+
+    return FuncAnimation(fig, update, frames=len(boids), interval=interval, blit=True)
@@ -0,0 +1,12 @@
+import numpy as np
+
+
+def get_pairs(positions, radius):
+    """Ordered pairs (i, j) of distinct positions closer than radius, found with a KD-tree (scipy)"""
+    from scipy.spatial import cKDTree
+
+    positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+    pairs = cKDTree(positions).query_pairs(radius, output_type="ndarray")
+    i, j = np.concatenate([pairs[:, 0], pairs[:, 1]]), np.concatenate([pairs[:, 1], pairs[:, 0]])
+    inside = ((positions[i] - positions[j]) ** 2).sum(axis=1) < radius**2  # query_pairs also keeps == radius
+    return i[inside], j[inside]
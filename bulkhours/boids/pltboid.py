@@ -1,11 +1,13 @@
-from pyparsing import string
 from typing import Iterable
 
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib import animation, path
 
+from .pltshape import Shape
+
 radians = float
+boid_shape, rotate_marker = Shape.init("basic"), Shape.rotate_marker
 
 
 
@@ -111,19 +113,130 @@ class Boid:
         return self
 
 
+class Boids:
+    """Population de Boid sous forme de tableaux (N, 2): les voisins de tous les Boids sont cherchés une seule fois
+    par itération (cKDTree) et les forces de Boid.interaction sont appliquées à tous les Boids en même temps.
+    """
+
+    def __init__(self, n: int, colors=None) -> None:
+        # Même tirage que n Boid() successifs
+        states = [np.random.uniform(-s, s, 2) for _ in range(n) for s in (Boid.taille, 5)]
+        states = np.array(states).reshape(n, 2, 2)
+        self.x, self.dx, self.colors = states[:, 0].copy(), states[:, 1].copy(), colors
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    @property
+    def direction(self) -> "np.ndarray":
+        return np.arctan2(self.dx[:, 1], self.dx[:, 0])
+
+    def angle_mort(self, rows: "np.ndarray", index: "np.ndarray") -> "np.ndarray":
+        "Masque (len(rows), k): True si le Boid index[r, j] est dans l'angle mort du Boid rows[r] (comme Boid)."
+        v = self.dx - self.x
+        v1, v2 = v[rows][:, None, :], v[np.minimum(index, len(self) - 1)]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cos_angle = (v1 * v2).sum(axis=2) / (np.linalg.norm(v1, axis=2) * np.linalg.norm(v2, axis=2))
+            return np.arccos(cos_angle) > 0.75 * np.pi
+
+    def voisins(self, seuil: float = 200):
+        """Distances et indices (N, max_voisins) des voisins visibles les plus proches, triés par distance croissante
+        (distance inf et indice N pour les places vides). k augmente pour les Boids qui ont trop de voisins dans
+        leur angle mort.
+        """
+        from scipy.spatial import cKDTree
+
+        n, m, tree = len(self), Boid.max_voisins, cKDTree(self.x)
+        distances, index = np.full((n, m), np.inf), np.full((n, m), n)
+
+        rows, k = np.arange(n), 2 * m + 1
+        while len(rows):
+            d, i = tree.query(self.x[rows], k=min(k, n), distance_upper_bound=seuil)
+            d, i = d.reshape(len(rows), -1), i.reshape(len(rows), -1)
+            visible = (i < n) & (i != rows[:, None]) & (d < seuil) & ~self.angle_mort(rows, i)
+
+            # Terminé si max_voisins sont visibles, si tous les voisins à moins de seuil ont été vus
+            done = (visible.sum(axis=1) >= m) | (i[:, -1] == n) | (i.shape[1] == n)
+
+            # Les visibles en premier (dans l'ordre des distances)
+            order = np.argsort(~visible[done], axis=1, kind="stable")[:, :m]
+            selected = np.take_along_axis(visible[done], order, axis=1)
+            d = np.where(selected, np.take_along_axis(d[done], order, axis=1), np.inf)
+            i = np.where(selected, np.take_along_axis(i[done], order, axis=1), n)
+            distances[rows[done], : d.shape[1]], index[rows[done], : i.shape[1]] = d, i
+
+            rows, k = rows[~done], 2 * k
+
+        return distances, index
+
+    def forces(self) -> "np.ndarray":
+        "Séparation, alignement, cohésion et force centripète (sans le bruit) de tous les Boids."
+        n, (distances, index) = len(self), self.voisins(200)
+        x, dx = np.concatenate([self.x, [[0, 0]]]), np.concatenate([self.dx, [[0, 0]]])  # Index n: place vide
+
+        proches = (distances < 50)[:, :, None]
+        separation = (proches * (self.x[:, None, :] - x[index])).sum(axis=1)
+
+        count = np.isfinite(distances).sum(axis=1)[:, None]
+        with np.errstate(invalid="ignore"):
+            align = np.where(count > 0, dx[index].sum(axis=1) / count - self.dx, 0)
+            cohere = np.where(count > 0, x[index].sum(axis=1) / count - self.x, 0)
+
+        return separation / 10 + align / 8 + cohere / 100 - self.x / 200
+
+    def interaction(self) -> "Boids":
+        "On déplace tous les Boids en fonction des forces qui s'y appliquent (voir Boid.interaction)"
+        self.dx += self.forces() + np.random.uniform(-5, 5, (len(self), 2))
+
+        # Les Boids ne peuvent pas aller plus vite que la musique
+        vitesse = np.linalg.norm(self.dx, axis=1)
+        self.dx[vitesse > 20] *= 20 / vitesse[vitesse > 20, None]
+
+        # On avance
+        self.x += self.dx
+
+        # On veille à rester dans le cadre par effet rebond
+        dehors = (np.abs(self.x) > Boid.taille).any(axis=1)[:, None]
+        bas = dehors & ((diff := self.x + Boid.taille) < 10)
+        self.x, self.dx = np.where(bas, -Boid.taille + 10 + diff, self.x), np.where(bas, -self.dx, self.dx)
+        haut = dehors & ((diff := Boid.taille - self.x) < 10)
+        self.x, self.dx = np.where(haut, Boid.taille - 10 - diff, self.x), np.where(haut, -self.dx, self.dx)
+
+        return self
+
+
 class Simulation:
-    def __init__(self, n: int, ax, seed: int = 2042, cmap: string = "jet") -> None:
-        cmap = plt.cm.get_cmap(cmap)
+    """Les Boids sont dessinés par une seule PathCollection: chaque Boid prend le marqueur de sa direction parmi
+    nangles marqueurs tournés, construits une seule fois.
+    """
+
+    nangles = 72
+
+    def __init__(self, n: int, ax, seed: int = 2042, cmap: str = "jet") -> None:
+        cmap = plt.get_cmap(cmap)
         np.random.seed(seed)
-        self.boids = list(Boid(color=cmap(i / n)) for i in range(n))
+        self.boids = Boids(n, colors=[cmap(i / n) for i in range(n)])
         self.artists = list()
         self.plot(ax)
 
-    def plot(self, ax) -> None:
+    @staticmethod
+    def get_markers(shape: path.Path = None, nangles: int = None) -> "list[path.Path]":
+        "Marqueurs (normalisés comme ceux de ax.plot) de shape pour nangles directions."
+        from matplotlib.markers import MarkerStyle
 
-        for boid in self.boids:
-            p, *_ = ax.plot(*boid.x, color=boid.color, markersize=15, marker=rotate_marker(boid_shape, boid.direction))
-            self.artists.append(p)
+        shape, nangles = shape if shape is not None else boid_shape, nangles or Simulation.nangles
+        markers = [MarkerStyle(rotate_marker(shape, a)) for a in 2 * np.pi * np.arange(nangles) / nangles]
+        return [m.get_path().transformed(m.get_transform()) for m in markers]
+
+    def get_paths(self) -> "list[path.Path]":
+        angles = np.round(self.boids.direction / (2 * np.pi) * len(self.markers)).astype(int) % len(self.markers)
+        return [self.markers[a] for a in angles]
+
+    def plot(self, ax) -> None:
+        self.markers = Simulation.get_markers()
+        self.collection = ax.scatter(*self.boids.x.T, s=15**2, c=self.boids.colors)
+        self.collection.set_paths(self.get_paths())
+        self.artists.append(self.collection)
 
         ax.set_xlim((-Boid.taille, Boid.taille))
         ax.set_ylim((-Boid.taille, Boid.taille))
@@ -132,8 +245,12 @@ class Simulation:
         ax.yaxis.set_visible(False)
 
     def iteration(self, _i: int):
-        self.boids = list(boid.interaction(self.boids) for boid in self.boids)
-        for p, boid in zip(self.artists, self.boids):
-            p.set_data(*boid.x)
-            p.set_marker(rotate_marker(boid_shape, boid.direction))
+        self.boids.interaction()
+        self.collection.set_offsets(self.boids.x)
+        self.collection.set_paths(self.get_paths())
         return self.artists
+
+    def animate(self, frames: int = 200, interval: int = 50) -> animation.FuncAnimation:
+        "Animation avec blitting: seule la collection des Boids est redessinée."
+        fig = self.collection.figure
+        return animation.FuncAnimation(fig, self.iteration, frames=frames, interval=interval, blit=True)
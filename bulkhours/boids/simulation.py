@@ -1,8 +1,10 @@
 import argparse
 import pygame
 import random
+import time
+import numpy as np
 
-from .boid import Boid
+from .flock import Flock
 from .obstacle import Obstacle
 from .button import Button
 
@@ -14,9 +16,9 @@ class PyGameRendering:
         pygame.init()
         pygame.display.Info()
 
-        Boid.width, Boid.height = pygame.display.Info().current_w, pygame.display.Info().current_h - 40
+        Flock.width, Flock.height = pygame.display.Info().current_w, pygame.display.Info().current_h - 40
         self.border = 30
-        self.screen = pygame.display.set_mode((Boid.width, Boid.height))
+        self.screen = pygame.display.set_mode((Flock.width, Flock.height))
         pygame.display.set_caption("Boids")
 
         # Fill background
@@ -24,20 +26,23 @@ class PyGameRendering:
         self.background = self.background.convert()
         self.background.fill((0, 0, 0))  # BLACK = (0, 0, 0)
 
-        self.boid_list = pygame.sprite.Group()
-        self.predator_list = pygame.sprite.Group()
+        # The boids and predators are Flock arrays, only blitted here
+        directory = os.path.dirname(__file__)
+        self.images = {
+            k: pygame.image.load(os.path.join(directory, f"{k}.png")).convert_alpha() for k in ["boid", "predator"]
+        }
+        self.boid_list, self.predator_list = None, None
         self.obstacle_list = pygame.sprite.Group()
-        self.all_sprites_list = pygame.sprite.LayeredDirty()
-        self.close_prey = pygame.sprite.Group()
+        self.all_sprites_list = pygame.sprite.Group()
         self.rebound_on_border = False
 
     def get_init_pos(self, border=False):
         return (
-            [random.randint(0, Boid.width), random.randint(0, Boid.height)]
+            [random.randint(0, Flock.width), random.randint(0, Flock.height)]
             if not border
             else [
-                random.randint(self.border, Boid.width - self.border),
-                random.randint(self.border, Boid.height - self.border),
+                random.randint(self.border, Flock.width - self.border),
+                random.randint(self.border, Flock.height - self.border),
             ]
         )
 
@@ -53,30 +58,37 @@ class PyGameRendering:
         field_of_view=200,
         max_speed=8,
     ):
-        img_file = "bulkhours/boids/predator.png" if "predator" in boids_list else "bulkhours/boids/boid.png"
+        """The weights and field of view are the ones of the first boids of the flock"""
         x, y = self.get_init_pos("predator" in boids_list)
+        if (flock := getattr(self, boids_list)) is not None and len(flock) > 0:
+            flock.add([[x, y]] * nboids)
+            return
+
+        image = self.images["predator" if "predator" in boids_list else "boid"]
+        flock = Flock(
+            [[x, y]] * nboids,
+            cohesion_weight=cohesion_weight,
+            alignment_weight=alignment_weight,
+            separation_weight=separation_weight,
+            obstacle_avoidance_weight=obstacle_avoidance_weight,
+            goal_weight=goal_weight,
+            field_of_view=field_of_view,
+            max_speed=max_speed,
+            size=image.get_size(),
+        )
+        setattr(self, boids_list, flock)
 
-        for _ in range(nboids):
-            boid = Boid(
-                x,
-                y,
-                cohesion_weight,
-                alignment_weight,
-                separation_weight,
-                obstacle_avoidance_weight,
-                goal_weight,
-                field_of_view,
-                max_speed,
-                img_file,
-            )
-            getattr(self, boids_list).add(boid)
-            self.all_sprites_list.add(boid)
-
-    def add_obstacle(self, nboids):
+    def add_obstacle(self, nboids, positions=None):
         for i in range(nboids):
             obstacle = Obstacle(
-                random.randint(0 + self.border, Boid.width - self.border),
-                random.randint(0 + self.border, Boid.height - self.border),
+                *(
+                    positions[i]
+                    if positions is not None
+                    else (
+                        random.randint(0 + self.border, Flock.width - self.border),
+                        random.randint(0 + self.border, Flock.height - self.border),
+                    )
+                )
             )
             # Add the obstacle to the lists of objects
             self.obstacle_list.add(obstacle)
@@ -90,19 +102,27 @@ class PyGameRendering:
         self.running = True
         self.all_sprites_list.clear(self.screen, self.background)
 
-    def update_rendering(self):
+    def update_rendering(self, buttons=()):
         if self.rebound_on_border:
             self.rebound()
 
-        # Create list of dirty sprites
-        rects = self.all_sprites_list.draw(self.screen)
+        self.draw()
+        for button in buttons:
+            button.draw()
 
         # Go ahead and update the screen with what we've drawn.
-        pygame.display.update(rects)
+        pygame.display.flip()
         # pygame.time.delay(10)
         # Used to manage how fast the screen updates
         self.clock.tick(60)
 
+    def draw(self):
+        self.screen.blit(self.background, (0, 0))
+        for flock, image in [(self.boid_list, self.images["boid"]), (self.predator_list, self.images["predator"])]:
+            if flock is not None:
+                self.screen.blits([(image, p) for p in flock.positions.tolist()], doreturn=False)
+        self.all_sprites_list.draw(self.screen)
+
     def get_event(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -115,7 +135,7 @@ class PyGameRendering:
 
             if event.key == pygame.K_p:
                 if (mods and pygame.KMOD_LSHIFT) or (mods and pygame.KMOD_CAPS):
-                    print("Add predator", self.predator_list)
+                    print("Add predator", len(self.predator_list or []))
                     self.add_boids(
                         "predator_list",
                         1,
@@ -124,23 +144,23 @@ class PyGameRendering:
                         field_of_view=70,
                         max_speed=8.5,
                     )
-                else:
-                    print("Delete predator", self.predator_list)
-                    self.predator_list.sprites()[-1].kill()
+                elif self.predator_list is not None and len(self.predator_list):
+                    print("Delete predator", len(self.predator_list))
+                    self.predator_list.remove(-1)
                 self.prepare()
             elif event.key == pygame.K_b:
                 if (mods and pygame.KMOD_LSHIFT) or (mods and pygame.KMOD_CAPS):
-                    print("Add boid", self.boid_list)
+                    print("Add boid", len(self.boid_list or []))
                     self.add_boids("boid_list", 1, obstacle_avoidance_weight=15, goal_weight=0, field_of_view=70)
-                else:
-                    print("Delete boid", self.boid_list)
-                    self.boid_list.sprites()[-1].kill()
+                elif self.boid_list is not None and len(self.boid_list):
+                    print("Delete boid", len(self.boid_list))
+                    self.boid_list.remove(-1)
                 self.prepare()
             elif event.key == pygame.K_o:
                 if (mods and pygame.KMOD_LSHIFT) or (mods and pygame.KMOD_CAPS):
                     print("Add obstacle", self.obstacle_list)
                     self.add_obstacle(1)
-                else:
+                elif self.obstacle_list:
                     print("Delete obstacle", self.obstacle_list)
                     self.obstacle_list.sprites()[-1].kill()
                 self.prepare()
@@ -151,15 +171,24 @@ class PyGameRendering:
                 print("QUIT K_ESCAPE")
                 self.running = False
 
+    def step(self):
+        """Apply the rules of the boids to all the boids and predators (one frame)"""
+        obstacles = [(obstacle.rect.x, obstacle.rect.y) for obstacle in self.obstacle_list]
+        if self.boid_list is not None:
+            self.boid_list.step(self.predator_list, obstacles)
+        if self.predator_list is not None:
+            self.predator_list.hunt(self.boid_list)
+
     def rebound(self):
         # TODO Either make this work or add a genetic algorithm and kill them
-        # If a predator manages to touch a prey, the prey gets eaten!
-        for boid in self.boid_list:
-            # collisions = pygame.sprite.spritecollide(predator, self.close_prey, True)
-            collisions = pygame.sprite.spritecollide(boid, self.obstacle_list, False)
-            for obstacle in collisions:
-                boid.velocityX += -1 * (obstacle.real_x - boid.rect.x)
-                boid.velocityY += -1 * (obstacle.real_y - boid.rect.y)
+        if self.boid_list is None:
+            return
+        for obstacle in self.obstacle_list:
+            delta = self.boid_list.positions - (obstacle.rect.x, obstacle.rect.y)
+            collisions = ((delta < obstacle.rect.size) & (-delta < self.boid_list.size)).all(axis=1)
+            self.boid_list.velocities[collisions] -= (obstacle.real_x, obstacle.real_y) - self.boid_list.positions[
+                collisions
+            ]
 
 
 def main2():
@@ -194,19 +223,83 @@ def main2():
     pygame.quit()
 
 
+def benchmark(sizes=(100, 500, 1000, 5000, 20000), steps=10, npredators=5, nobstacles=3):
+    """Frames per second of the simulation (rules and drawing, without frame rate limit) vs the flock size"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    results = {}
+    for size in sizes:
+        random.seed(0)
+        rendering = PyGameRendering()
+        rendering.add_boids("boid_list", size, obstacle_avoidance_weight=15, goal_weight=0, field_of_view=70)
+        rendering.add_boids(
+            "predator_list", npredators, obstacle_avoidance_weight=0, goal_weight=50, field_of_view=70, max_speed=8.5
+        )
+        rendering.add_obstacle(nobstacles)
+        # Flocks spread over the screen (add_boids starts them at the same point)
+        rendering.boid_list.positions = np.array([rendering.get_init_pos() for _ in range(size)], dtype=float)
+        rendering.prepare()
+        rendering.step()  # Warm up (imports)
+
+        start = time.perf_counter()
+        for _ in range(steps):
+            rendering.step()
+            rendering.draw()
+        results[size] = steps / (time.perf_counter() - start)
+        print(f"{size:>6} boids: {results[size]:8.1f} fps")
+        rendering.quit()
+
+    return results
+
+
+def replay(filename):
+    """Show a trajectory recorded by headless.HeadlessSimulation.run"""
+    from .headless import load_trajectory
+
+    trajectory = load_trajectory(filename)
+    rendering = PyGameRendering()
+    rendering.add_obstacle(len(trajectory["obstacles"]), positions=trajectory["obstacles"].tolist())
+    rendering.boid_list, rendering.predator_list = Flock(np.zeros((0, 2))), Flock(np.zeros((0, 2)))
+    rendering.prepare()
+
+    for boids, predators in zip(trajectory["boids"], trajectory["predators"]):
+        rendering.get_event()
+        if not rendering.running:
+            break
+        rendering.boid_list.positions = boids[~np.isnan(boids[:, 0]), :2]
+        rendering.predator_list.positions = predators[~np.isnan(predators[:, 0]), :2]
+        rendering.draw()
+        pygame.display.flip()
+        rendering.clock.tick(60)
+    rendering.quit()
+
+
 def main():
-    import os
+    parser = argparse.ArgumentParser(description="Boids simulation")
+    parser.add_argument("--benchmark", action="store_true", help="Frames per second vs flock size (no display)")
+    parser.add_argument("--record", help="Run without display and save the trajectories in this npz file")
+    parser.add_argument("--steps", type=int, default=1000, help="Number of steps of --record")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of --record")
+    parser.add_argument("--replay", help="Show the trajectories of a npz file")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+        return
+    if args.record:
+        from .headless import HeadlessSimulation
 
-    if 0:
-        main2()
+        start = time.perf_counter()
+        HeadlessSimulation(seed=args.seed).run(args.steps, args.record)
+        print(f"{args.steps} steps saved in {args.record} ({args.steps / (time.perf_counter() - start):.0f} steps/s)")
+        return
+    if args.replay:
+        replay(args.replay)
         return
-    rendering = PyGameRendering()
-    rendering.add_boids("boid_list", 70, obstacle_avoidance_weight=15, goal_weight=0, field_of_view=70, max_speed=88 )
-    rend
-    ering.add_boids(
 
-        "predator_list", 5, obstacle_avoidance_weight=0, goal_weight=50, field_of_view=70, max_speed=88
-    )
+    rendering = PyGameRendering()
+    rendering.add_boids("boid_list", 70, obstacle_avoidance_weight=15, goal_weight=0, field_of_view=70, max_speed=88)
+    rendering.add_boids("predator_list", 5, obstacle_avoidance_weight=0, goal_weight=50, field_of_view=70, max_speed=88)
     rendering.add_obstacle(3)
 
     but = Button("Yo man", rendering.screen)
@@ -215,66 +308,6 @@ def main():
 
     while rendering.running:
         rendering.get_event()
-        pos = pygame.mouse.get_pos()
-
-        # Scan for boids and predators to pay attention to
-        for boid in rendering.boid_list:
-            closeboid = []
-            visible_obstacles = []
-            avoid = False
-            for otherboid in rendering.boid_list:
-                if otherboid == boid:
-                    continue
-                distance = boid.distance(otherboid)
-                if distance < boid.field_of_view:
-                    closeboid.append(otherboid)
-
-            for predator in rendering.predator_list:
-                distance = boid.distance(predator)
-                if distance < boid.field_of_view:
-                    avoid = True
-
-            for obstacle in rendering.obstacle_list:
-                distance = boid.distance(obstacle)
-                if distance <= boid.field_of_view:
-                    visible_obstacles.append(obstacle)
-
-            # Apply the rules of the boids
-            boid.cohesion(closeboid)
-            boid.alignment(closeboid)
-            boid.separation(closeboid, 20)
-            if len(visible_obstacles) > 0:
-                for obstacle in visible_obstacles:
-                    boid.obstacle_avoidance(obstacle)
-            if avoid:
-                boid.flee(predator)
-            else:
-                #boid.goal(*pos)
-                boid.go_to_middle()
-            boid.update(True)
-
-        for predator in rendering.predator_list:
-            closeboid = []
-            rendering.close_prey.empty()
-            for otherboid in rendering.predator_list:
-                if otherboid == predator:
-                    continue
-                distance = predator.distance(otherboid)
-                if distance < predator.field_of_view:
-                    closeboid.append(otherboid)
-            for boid in rendering.boid_list:
-                distance = boid.distance(boid)
-                if distance < predator.field_of_view:
-                    rendering.close_prey.add(boid)
-
-            # Apply the rules of the boids
-            predator.cohesion(closeboid)
-            predator.alignment(closeboid)
-            predator.separation(closeboid, 20)
-            predator.attack(rendering.close_prey)
-            predator.update(True)
-            collisions = pygame.sprite.spritecollide(predator, rendering.close_prey, True)
-
-        but.draw()
-        rendering.update_rendering()
+        rendering.step()
+        rendering.update_rendering(buttons=[but])
     rendering.quit()
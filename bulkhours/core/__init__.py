@@ -11,7 +11,7 @@ from . import tools  # noqa
 from . import firebase  # noqa
 from . import buttons  # noqa
 from .gpt import *  # noqa
-from .equals import is_equal  # noqa
+from .equals import is_equal, is_equal_many  # noqa
 from .cache_manager import CacheManager  # noqa
 from .widget_texts import WidgetTextArea  # noqa
 
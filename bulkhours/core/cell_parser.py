@@ -1,14 +1,19 @@
 import re
+import copy
+from collections import OrderedDict
 
 from .line_parser import LineParser
 
+ARGS_SEPARATOR = re.compile(r",\s*(?![^()]*\))")  # Commas outside of parenthesis
+INDENTATION = re.compile(r"^([\s]*)[\s]+.*$")
+
 
 def get_equals_args(code, func_id="bulkhours.is_equal"):
     args = code.replace(" ", "").split(func_id)
     if len(args) == 1:
         return {}
 
-    args = re.split(r",\s*(?![^()]*\))", args[1][1 : args[1].rfind(")")])
+    args = ARGS_SEPARATOR.split(args[1][1 : args[1].rfind(")")])
 
     fargs = {}
     for i, a in enumerate(args):
@@ -24,6 +29,8 @@ def get_equals_args(code, func_id="bulkhours.is_equal"):
 
 class CellParser:
     meta_modes = ["evaluation", "explanation"]
+    decompositions = OrderedDict()  # Shared by all the answers of a same cell source
+    max_decompositions = 256
 
     def __init__(self, parse_cell=False, **kwargs):
         # Reformat db info to cell format
@@ -53,7 +60,7 @@ class CellParser:
             self.minfo[key][ekey] = val
 
     def get_code(self, c):
-        # TODO: Fix this hack. Need to be run to avoid problems, if not launched, solution=user
+        # Need to be run to avoid problems, if not launched, solution=user (memoized: a known source is not parsed)
         self.get_cell_decomposition()
         return self.minfo[c]["code"] if c in self.minfo and "code" in self.minfo[c] else ""
 
@@ -136,7 +143,7 @@ class CellParser:
             self.minfo[tmode]["emp_max_score"] = 0
 
     def block_equal_line(self, mode, l):
-        indent = " " * (re.sub(r"^([\s]*)[\s]+.*$", r"\g<1>", l).count(" ") + 1)
+        indent = " " * (INDENTATION.sub(r"\g<1>", l).count(" ") + 1)
         args = get_equals_args(l, func_id="bulkhours.is_equal")
         if "data_ref" not in args:
             args["data_ref"] = args["data_test"].replace("student.", "teacher.")
@@ -188,6 +195,29 @@ class CellParser:
 
     def get_cell_decomposition(self):
         cell_source, cell_id = self.minfo["cell_source"], self.minfo["cinfo"].cell_id
+
+        key = (cell_source, cell_id, self.is_cell_type())
+        if key not in CellParser.decompositions:
+            self.parse_cell_decomposition(cell_source, cell_id)
+            if cell_source is not None:
+                keys = ["main_execution", "answer"] + CellParser.meta_modes
+                CellParser.decompositions[key] = copy.deepcopy({k: self.minfo[k] for k in keys if k in self.minfo})
+                if len(CellParser.decompositions) > CellParser.max_decompositions:
+                    CellParser.decompositions.popitem(last=False)
+            return
+
+        # As a new parsing: the parsed code even if minfo was modified, the line options of the current config
+        CellParser.decompositions.move_to_end(key)
+        self.minfo.update(copy.deepcopy(CellParser.decompositions[key]))
+        for l in cell_source.splitlines():
+            self.store_line_options(l, cell_source, cell_id)
+
+    def store_line_options(self, l, cell_source, cell_id):
+        if "%evaluation_cell_id" == l.replace(" ", "").split("-")[0]:
+            info = LineParser(l, cell_source, is_cell=False)
+            self.minfo[cell_id] = vars(info)
+
+    def parse_cell_decomposition(self, cell_source, cell_id):
         for tmode in ["main_execution"] + CellParser.meta_modes:
             if tmode in self.minfo and "code" in self.minfo[tmode]:
                 self.minfo[tmode]["code"] = ""
@@ -214,9 +244,7 @@ class CellParser:
                 if l.split("(")[0] in [f"student_{tmode}_function("]:
                     l = ""
 
-            if "%evaluation_cell_id" == l.replace(" ", "").split("-")[0]:
-                info = LineParser(l, cell_source, is_cell=False)
-                self.minfo[cell_id] = vars(info)
+            self.store_line_options(l, cell_source, cell_id)
 
             if ".is_equal" in l:
                 l = self.block_equal_line(mode, l)
@@ -41,16 +41,18 @@ def run_cell(code, stdout=True):
     ipp.run_cell(code)
 
 
-def generate_empty_context(context):
-    run_cell(
-        f"""class CellContext:
+def get_empty_context_code(context):
+    return f"""class CellContext:
     @property
     def stdout2(self):
         return False
                                    
 {context} = CellContext()
 """
-    )
+
+
+def generate_empty_context(context):
+    run_cell(get_empty_context_code(context))
 
 
 def add_variables_in_contexts(cell_id, configs):
@@ -0,0 +1,120 @@
+import os
+import json
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-kernel locking
+    fcntl = None
+
+
+class AppendLog:
+    """Local storage engine: the database is a json snapshot ('course.json') plus an
+    append-only log ('course.json.log') with one record per set/update/delete.
+    Reads replay only the new log records, writes append one record.
+    The log is compacted into the snapshot every max_records records.
+    """
+
+    def __init__(self, filename, max_records=500) -> None:
+        self.filename, self.logname, self.max_records = filename, filename + ".log", max_records
+        self.data, self.stamp, self.offset, self.records = {}, None, 0, 0
+
+    def get_stamp(self):
+        if not os.path.exists(self.filename):
+            return None
+        stat = os.stat(self.filename)
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        """Read under a shared lock: no compaction can truncate the log between the snapshot check and the replay"""
+        if not os.path.exists(self.logname):  # Nothing compacted yet: any new record is replayed from offset 0
+            return self.reload()
+
+        with open(self.logname, "rb") as log_file:
+            self.lock(log_file, shared=True)
+            try:
+                return self.reload()
+            finally:
+                self.lock(log_file, unlock=True)
+
+    def reload(self):
+        # The snapshot changed (first load or compaction by another kernel): reload everything
+        if (stamp := self.get_stamp()) != self.stamp or self.get_log_size() < self.offset:
+            self.data = {}
+            if stamp is not None:
+                with open(self.filename) as json_file:
+                    self.data = json.load(json_file)
+            self.stamp, self.offset, self.records = stamp, 0, 0
+
+        self.replay()
+        return self.data
+
+    def get_log_size(self):
+        return os.path.getsize(self.logname) if os.path.exists(self.logname) else 0
+
+    def replay(self) -> None:
+        if self.get_log_size() <= self.offset:
+            return
+
+        with open(self.logname, "rb") as log_file:
+            log_file.seek(self.offset)
+            for line in log_file:
+                if not line.endswith(b"\n"):  # Record still being written
+                    break
+                self.apply(json.loads(line))
+                self.offset, self.records = self.offset + len(line), self.records + 1
+
+    def apply(self, record) -> None:
+        op, question, user = record["op"], record["question"], record["user"]
+
+        if op == "delete":
+            if question in self.data:
+                self.data[question].pop(user, None)
+            return
+
+        if question not in self.data:
+            self.data[question] = {}
+        if op == "set" or user not in self.data[question]:
+            self.data[question][user] = {}
+        self.data[question][user].update(record["data"])
+
+    def lock(self, log_file, unlock=False, shared=False) -> None:
+        if fcntl is not None:
+            fcntl.flock(log_file, fcntl.LOCK_UN if unlock else fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+
+    def append(self, op, question, user, data=None):
+        record = dict(op=op, question=question, user=user, data=data if data is not None else {})
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+        with open(self.logname, "ab") as log_file:
+            self.lock(log_file)
+            try:
+                self.reload()
+                log_file.write(line)
+                log_file.flush()
+                self.apply(record)
+                self.offset, self.records = self.offset + len(line), self.records + 1
+
+                if self.records >= self.max_records:
+                    self.compact(log_file)
+            finally:
+                self.lock(log_file, unlock=True)
+
+        return self.data
+
+    def compact(self, log_file=None) -> None:
+        if log_file is None:
+            with open(self.logname, "ab") as log_file:
+                self.lock(log_file)
+                try:
+                    self.reload()
+                    return self.compact(log_file)
+                finally:
+                    self.lock(log_file, unlock=True)
+
+        # Atomic snapshot first: replaying the old log on top of it is harmless
+        with open(tmpname := self.filename + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=4)
+        os.replace(tmpname, self.filename)
+        log_file.truncate(0)
+
+        self.stamp, self.offset, self.records = self.get_stamp(), 0, 0
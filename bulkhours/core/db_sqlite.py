@@ -0,0 +1,171 @@
+import os
+import json
+import sqlite3
+import contextlib
+
+from .db_log import AppendLog
+
+
+class SqliteDocument:
+    def __init__(self, client, question, user, data=None) -> None:
+        self.client, self.question, self.user, self.data = client, question, user, data
+
+    @property
+    def id(self):
+        return self.user
+
+    @property
+    def exists(self):
+        return bool(self.to_dict())
+
+    def get(self):
+        return SqliteDocument(self.client, self.question, self.user, self.client.read(self.question, self.user))
+
+    def to_dict(self):
+        return self.data if self.data is not None else self.client.read(self.question, self.user)
+
+    def set(self, data) -> None:
+        self.client.write("set", self.question, self.user, data)
+
+    def update(self, data) -> None:
+        self.client.write("update", self.question, self.user, data)
+
+    def delete(self) -> None:
+        self.client.write("delete", self.question, self.user)
+
+
+class SqliteCollection:
+    def __init__(self, client, question) -> None:
+        self.client, self.question = client, question
+
+    def document(self, user):
+        return SqliteDocument(self.client, self.question, user)
+
+    def stream(self):
+        rows = self.client.connection.execute(
+            "SELECT user, data FROM documents WHERE question_id = ?", (self.question,)
+        ).fetchall()
+        return [SqliteDocument(self.client, self.question, user, json.loads(data)) for user, data in rows]
+
+    def where(self, field, op, value):
+        return SqliteQuery(self, field, op, value)
+
+
+class SqliteQuery:
+    """Same api as a firestore query, the filters on update_time use the index"""
+
+    operators = ["<", "<=", "==", "!=", ">=", ">"]
+
+    def __init__(self, collection, field, op, value) -> None:
+        self.collection, self.field, self.op, self.value = collection, field, op, value
+
+    def stream(self):
+        from .firebase import DbQuery
+
+        if self.field != "update_time" or self.op not in SqliteQuery.operators:
+            return DbQuery(self.collection, self.field, self.op, self.value).stream()
+
+        client, question = self.collection.client, self.collection.question
+        rows = client.connection.execute(
+            f"SELECT user, data FROM documents WHERE question_id = ? AND update_time {self.op} ?",
+            (question, self.value),
+        ).fetchall()
+        return [SqliteDocument(client, question, user, json.loads(data)) for user, data in rows]
+
+
+class SqliteBatch:
+    """Same api as firestore WriteBatch: writes are committed in a single transaction"""
+
+    def __init__(self, client) -> None:
+        self.client, self.writes = client, []
+
+    def set(self, document, data) -> None:
+        self.writes.append(("set", document, data))
+
+    def update(self, document, data) -> None:
+        self.writes.append(("update", document, data))
+
+    def delete(self, document) -> None:
+        self.writes.append(("delete", document, None))
+
+    def commit(self) -> None:
+        with self.client.transaction():
+            for op, document, data in self.writes:
+                self.client.write(op, document.question, document.user, data)
+        self.writes = []
+
+
+class SqliteClient:
+    """Local database shared by several kernels: one row per (question_id, user) document"""
+
+    def __init__(self, filename, snapshot=None) -> None:
+        self.filename, self.depth = filename, 0
+        self.connection = sqlite3.connect(filename, timeout=30, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS documents (
+    question_id TEXT NOT NULL,
+    user TEXT NOT NULL,
+    data TEXT NOT NULL,
+    update_time TEXT,
+    PRIMARY KEY (question_id, user)
+) WITHOUT ROWID"""
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS documents_update_time ON documents (question_id, update_time)"
+        )
+
+        if snapshot is not None and os.path.exists(snapshot) and self.is_empty():
+            self.import_snapshot(snapshot)
+
+    def is_empty(self):
+        return self.connection.execute("SELECT 1 FROM documents LIMIT 1").fetchone() is None
+
+    def import_snapshot(self, snapshot) -> None:
+        # Migration from the json database (and its append log if any)
+        with self.transaction():
+            for question, documents in AppendLog(snapshot).load().items():
+                for user, data in documents.items():
+                    self.write("set", question, user, data)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        if self.depth == 0:
+            self.connection.execute("BEGIN IMMEDIATE")
+        self.depth += 1
+        try:
+            yield self.connection
+        except BaseException:
+            self.depth -= 1
+            if self.depth == 0:
+                self.connection.execute("ROLLBACK")
+            raise
+        self.depth -= 1
+        if self.depth == 0:
+            self.connection.execute("COMMIT")
+
+    def collection(self, question):
+        return SqliteCollection(self, question)
+
+    def batch(self):
+        return SqliteBatch(self)
+
+    def read(self, question, user):
+        row = self.connection.execute(
+            "SELECT data FROM documents WHERE question_id = ? AND user = ?", (question, user)
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else {}
+
+    def write(self, op, question, user, data=None) -> None:
+        with self.transaction() as connection:
+            if op == "delete":
+                connection.execute("DELETE FROM documents WHERE question_id = ? AND user = ?", (question, user))
+                return
+
+            if op == "update":
+                data = {**self.read(question, user), **data}
+            connection.execute(
+                "INSERT OR REPLACE INTO documents (question_id, user, data, update_time) VALUES (?, ?, ?, ?)",
+                (question, user, json.dumps(data, ensure_ascii=False), data.get("update_time")),
+            )
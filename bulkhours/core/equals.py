@@ -8,9 +8,137 @@ import os
 
 from . import contexts
 
+CHUNK_SIZE = 1 << 16
+comparators = {}
+
+
+def register_comparator(*types):
+    """Register the function computing the distance between a student and a teacher data of these types"""
+
+    def wrap(f):
+        for t in types:
+            comparators[t] = f
+        return f
+
+    return wrap
+
+
+def get_comparator(data):
+    for t in type(data).__mro__:
+        if t in comparators:
+            return comparators[t]
+    return default_distance
+
+
+def is_l1(norm):
+    return norm in ["L1-norm", "L1norm"]
+
+
+def is_l2(norm):
+    return norm in ["L2-norm", "L2norm"]
+
+
+def reduce_error(estimation_error, norm, axis=None):
+    if is_l1(norm):
+        return np.sum(estimation_error, axis=axis)
+    elif is_l2(norm):
+        return np.linalg.norm(estimation_error) if axis is None else np.sqrt(np.sum(estimation_error**2, axis=axis))
+    else:  # Linf-norm
+        return np.max(estimation_error, axis=axis)
+
+
+def default_distance(data_test, data_ref, norm="Linf-norm", **kwargs):
+    estimation_error = np.abs(data_test - data_ref)
+
+    if type(estimation_error) == pd.DataFrame:
+        estimation_error = estimation_error.values
+
+    return reduce_error(estimation_error, norm)
+
+
+@register_comparator(np.ndarray, list, tuple)
+def array_distance(data_test, data_ref, norm="Linf-norm", stop=np.inf, **kwargs):
+    """Compute the distance chunk by chunk (no full error array), and stop as soon as it reaches stop"""
+    data_test, data_ref = np.asarray(data_test), np.asarray(data_ref)
+    if data_test.shape != data_ref.shape or data_test.size <= CHUNK_SIZE:  # Broadcasting or small arrays
+        return default_distance(data_test, data_ref, norm=norm)
+
+    data_test, data_ref = data_test.reshape(-1), data_ref.reshape(-1)
+    distance = 0.0
+    for i in range(0, data_test.size, CHUNK_SIZE):
+        estimation_error = np.abs(data_test[i : i + CHUNK_SIZE] - data_ref[i : i + CHUNK_SIZE])
+        if is_l1(norm):
+            distance += np.sum(estimation_error)
+        elif is_l2(norm):
+            distance += np.sum(estimation_error**2)
+        else:
+            distance = np.maximum(distance, np.max(estimation_error))
+
+        if not (np.sqrt(distance) if is_l2(norm) else distance) < stop:  # Also stops on nan
+            break
+
+    return np.sqrt(distance) if is_l2(norm) else distance
+
+
+@register_comparator(pd.DataFrame, pd.Series)
+def frame_distance(data_test, data_ref, norm="Linf-norm", stop=np.inf, **kwargs):
+    if (
+        data_test.shape == data_ref.shape
+        and data_test.index.equals(data_ref.index)
+        and (type(data_test) == pd.Series or data_test.columns.equals(data_ref.columns))
+        and all(pd.api.types.is_numeric_dtype(t) for t in list(np.atleast_1d(data_test.dtypes)))
+        and all(pd.api.types.is_numeric_dtype(t) for t in list(np.atleast_1d(data_ref.dtypes)))
+        and not (type(data_test) == pd.Series and (data_test.hasnans or data_ref.hasnans))
+    ):
+        return array_distance(data_test.to_numpy(), data_ref.to_numpy(), norm=norm, stop=stop)
+
+    # Different labels or nan in a Series: let pandas align them (nan for missing values), its reductions skip nan
+    return default_distance(data_test, data_ref, norm=norm)
+
+
+def ngram_ratio(data_test, data_ref, n=2):
+    """Linear time similarity: Dice coefficient of the character n-grams"""
+    from collections import Counter
+
+    if len(data_test) < n or len(data_ref) < n:
+        return float(data_test == data_ref)
+
+    ngrams_test = Counter(data_test[i : i + n] for i in range(len(data_test) - n + 1))
+    ngrams_ref = Counter(data_ref[i : i + n] for i in range(len(data_ref) - n + 1))
+    common = sum((ngrams_test & ngrams_ref).values())
+    return 2.0 * common / (sum(ngrams_test.values()) + sum(ngrams_ref.values()))
+
+
+@register_comparator(str)
+def string_distance(data_test, data_ref, similarity="sequence", **kwargs):
+    data_test, data_ref = data_test.replace("\n", ""), data_ref.replace("\n", "")
+    if data_test == data_ref:
+        return 0.0
+
+    if similarity in ["ngram", "linear"]:
+        return np.abs(1.0 - ngram_ratio(data_test, data_ref))
+    return np.abs(1.0 - difflib.SequenceMatcher(None, data_test, data_ref).ratio())
+
+
+def get_score(distance, error=1e-8, policy="strict", min_score=0, max_score=10):
+    if policy in ["gaussian", "normal"]:
+        score = np.exp(-((distance / error) ** 2) / 2)
+    else:  # strict
+        score = np.clip(np.where(distance < error, 1.0, 0.0), 0, 1)
+
+    return np.round(score * (max_score - min_score) + min_score, 1)
+
 
 def is_equal(
-    data_test, data_ref, norm="Linf-norm", error=1e-8, policy="strict", min_score=0, max_score=10, cmax_score=False
+    data_test,
+    data_ref,
+    norm="Linf-norm",
+    error=1e-8,
+    policy="strict",
+    min_score=0,
+    max_score=10,
+    cmax_score=False,
+    similarity="sequence",
 ):
     """Return the student score compared to a benchmark value
 
@@ -31,6 +159,10 @@ def is_equal(
       - strict: policy is max_score if |distance| < error, 0 otherwise
       - gaussian: policy max_score * exp(-(distance/error)**2/2)
 
+    :param similarity: string comparison
+      - sequence: 1 - difflib.SequenceMatcher ratio (quadratic)
+      - ngram: 1 - Dice coefficient of the character bigrams (linear)
+
     :return: a note between the minimal note and maximal note
 
     examples
@@ -47,35 +179,45 @@ def is_equal(
     if type(data_test) != type(data_ref):
         return min_score
 
-    # Get error from student
-    if type(data_test) in [list, tuple]:
-        data_test = np.array(data_test)
-        data_ref = np.array(data_ref)
-
-    if type(data_test) == str:
-        estimation_error = np.abs(
-            1.0 - difflib.SequenceMatcher(None, data_test.replace("\n", ""), data_ref.replace("\n", "")).ratio()
-        )
-    else:
-        estimation_error = np.abs(data_test - data_ref)
+    # With the strict policy, the comparison can stop at the first element out of tolerance
+    stop = np.inf if policy in ["gaussian", "normal"] else error
+    distance = get_comparator(data_test)(data_test, data_ref, norm=norm, stop=stop, similarity=similarity)
 
-    if type(estimation_error) == pd.DataFrame:
-        estimation_error = estimation_error.values
+    return np.float64(get_score(distance, error=error, policy=policy, min_score=min_score, max_score=max_score))
 
-    if norm in ["L1-norm", "L1norm"]:
-        distance = np.sum(estimation_error)
-    elif norm in ["L2-norm", "L2norm"]:
-        distance = np.linalg.norm(estimation_error)
-    else:  # Linf-norm
-        distance = np.max(estimation_error)
 
-    if policy in ["gaussian", "normal"]:
-        score = np.exp(-((distance / error) ** 2) / 2)
-    else:  # strict
-        score = np.clip(float(distance < error), 0, 1)
+def is_equal_many(
+    data_tests, data_ref, norm="Linf-norm", error=1e-8, policy="strict", min_score=0, max_score=10, **kwargs
+):
+    """Return the scores of a list of student data compared to a single benchmark value (same parameters as is_equal).
+    Numerical data with the shape of data_ref are compared in a single vectorized call.
+    """
+    distances = np.full(len(data_tests), np.inf)  # Type mismatch: min_score
+
+    ref = np.asarray(data_ref) if isinstance(data_ref, (np.ndarray, list, tuple, int, float, np.number)) else None
+    is_vectorized = ref is not None and np.issubdtype(ref.dtype, np.number)
+
+    vectorized = []
+    for i, data_test in enumerate(data_tests):
+        if type(data_test) != type(data_ref):
+            continue
+        test = np.asarray(data_test) if is_vectorized else None
+        if is_vectorized and np.issubdtype(test.dtype, np.number) and test.shape == ref.shape:
+            vectorized.append((i, test))
+        else:
+            try:
+                distances[i] = get_comparator(data_test)(data_test, data_ref, norm=norm, **kwargs)
+            except (ValueError, TypeError):  # Shapes or types that can not be compared: min_score
+                pass
+
+    if len(vectorized) > 0:
+        tests = np.stack([test for _, test in vectorized]).reshape(len(vectorized), -1)
+        estimation_errors = np.abs(tests - ref.reshape(1, -1))
+        distances[[i for i, _ in vectorized]] = (
+            reduce_error(estimation_errors, norm, axis=1) if ref.size > 0 else np.zeros(len(vectorized))
+        )
 
-    final_score = np.round(score * (max_score - min_score) + min_score, 1)
-    return final_score
+    return get_score(distances, error=error, policy=policy, min_score=min_score, max_score=max_score)
 
 
 def explain_student(student_data, teacher_data, raw=False):
@@ -99,16 +241,9 @@ def explain_student(student_data, teacher_data, raw=False):
         IPython.get_ipython().run_cell(explanation_code)
 
 
-def evaluate_student(student_data, teacher_data, raw=False, use_student_context=True):
-    """
-    This function is used to evaluate the student code.
-
-    
-    :param debug: this is a first param
-    :returns: this is a description of what is returned
-    """
+def get_evaluation_code(teacher_data):
     # Get the formatted evaluation code
-    evaluation_code = (
+    return (
         teacher_data.get_code("evaluation")
         + """global eresult
 eresult = student_evaluation_function()
@@ -117,6 +252,26 @@ os.environ['FINAL_SCORE'] = str(eresult)
 """
     )
 
+
+def run_evaluation(evaluation_code, stdout=True, reset=False):
+    if reset:  # A failing evaluation must not keep the score of the previous one
+        os.environ.pop("FINAL_SCORE", None)
+
+    contexts.run_cell(evaluation_code, stdout)
+
+    return float(os.environ["FINAL_SCORE"]) if "FINAL_SCORE" in os.environ else None
+
+
+def evaluate_student(student_data, teacher_data, raw=False, use_student_context=True):
+    """
+    This function is used to evaluate the student code.
+
+    
+    :param debug: this is a first param
+    :returns: this is a description of what is returned
+    """
+    evaluation_code = get_evaluation_code(teacher_data)
+
     do_debug = "debug=true" in evaluation_code.replace(" ", "").lower()
 
     # Run the teacher code if needed
@@ -139,14 +294,11 @@ os.environ['FINAL_SCORE'] = str(eresult)
     if "show_code=true" in teacher_data.get_code("evaluation").replace(" ", "").lower():
         print(evaluation_code)
 
-    contexts.run_cell(evaluation_code, do_debug)
-
-    score = float(os.environ["FINAL_SCORE"])
+    score = run_evaluation(evaluation_code, do_debug)
 
     if raw:
         return score
 
-    contexts.run_cell(evaluation_code.replace("student.", "teacher."), stdout=False)
-    max_score = float(os.environ["FINAL_SCORE"])
+    max_score = run_evaluation(evaluation_code.replace("student.", "teacher."), stdout=False)
 
     return f"{score}/{max_score}"
@@ -1,9 +1,12 @@
 import os
 import json
+import operator
 import datetime
 import zoneinfo
 from argparse import Namespace
 from . import tools
+from .db_log import AppendLog
+from .db_sqlite import SqliteClient
 
 REF_USER = "solution"
 
@@ -20,6 +23,9 @@ def get_question_id(question, sep="_", cinfo=None):
 class DbDocument:
     data_base_cache = None
     data_base_info = None
+    data_base_engine = None
+    data_base_client = None
+    engines = {"json": None, "log": AppendLog}
 
     compliant_fields = {
         "bkloud": ["type", "project_id", "private_key_id", "private_key", "client_email", "client_id", "auth_uri"]
@@ -32,36 +38,59 @@ class DbDocument:
         "global": {
             "admins": "",
             "chatgpt": False,
+            "grading_memory_limit": 0,
+            "grading_workers": 0,
             "language": "fr",
             "norm20": False,
             "restricted": False,
             "virtual_rooms": "room1",
         },
         "notebook": {"exercices": "", "evaluation": "", "page": ""},
-        "session": dict(email="john.doe@un.known", notebook_id="n", database="data/cache/starwars.json", subject="s"),
+        "session": dict(
+            email="john.doe@un.known", notebook_id="n", database="data/cache/starwars.json", subject="s", storage="json"
+        ),
     }
 
     @staticmethod
     def write_cache_data() -> None:
-        if DbDocument.data_base_info is not None:
+        if DbDocument.data_base_client is not None:
+            return
+        if DbDocument.data_base_engine is not None:
+            DbDocument.data_base_engine.compact()
+        elif DbDocument.data_base_info is not None:
             with open(DbDocument.data_base_info, "w", encoding="utf-8") as f:
                 json.dump(DbDocument.data_base_cache, f, ensure_ascii=False, indent=4)
 
     @staticmethod
     def read_cache_data() -> None:
-        if DbDocument.data_base_info is not None and os.path.exists(DbDocument.data_base_info):
+        if DbDocument.data_base_client is not None:
+            return
+        if DbDocument.data_base_engine is not None:
+            DbDocument.data_base_cache = DbDocument.data_base_engine.load()
+        elif DbDocument.data_base_info is not None and os.path.exists(DbDocument.data_base_info):
             with open(DbDocument.data_base_info) as json_file:
                 DbDocument.data_base_cache = json.load(json_file)
 
     @staticmethod
-    def set_cache_data(database) -> None:
-        DbDocument.data_base_cache = {}
+    def log_cache_data(op, question, user, data=None) -> None:
+        DbDocument.data_base_cache = DbDocument.data_base_engine.append(op, question, user, data)
+
+    @staticmethod
+    def set_cache_data(database, storage="json") -> None:
+        DbDocument.data_base_cache, DbDocument.data_base_engine, DbDocument.data_base_client = {}, None, None
         if type(database) == dict:
             DbDocument.data_base_cache = database
         elif type(database) == str:
             if not os.path.exists(os.path.dirname(database)):
                 database = os.path.abspath(os.path.dirname(__file__) + f"/../../{database}")
             DbDocument.data_base_info = database
+            if storage == "sqlite" or os.path.splitext(database)[1] in [".db", ".sqlite"]:
+                if database.endswith(".json"):  # Migrate the json database in a sqlite file next to it
+                    DbDocument.data_base_client = SqliteClient(database[:-5] + ".sqlite", snapshot=database)
+                else:
+                    DbDocument.data_base_client = SqliteClient(database)
+            elif (engine := DbDocument.engines.get(storage)) is not None:
+                DbDocument.data_base_engine = engine(database)
             DbDocument.read_cache_data()
         else:
             print("Fuck")
@@ -74,6 +103,9 @@ class DbDocument:
         return self.user
 
     def set(self, data) -> None:
+        if DbDocument.data_base_engine is not None:
+            return DbDocument.log_cache_data("set", self.question, self.user, data)
+
         DbDocument.read_cache_data()
         if self.question not in DbDocument.data_base_cache:
             DbDocument.data_base_cache[self.question] = {}
@@ -85,19 +117,34 @@ class DbDocument:
         return self
 
     def to_dict(self):
-        return DbDocument.data_base_cache[self.question][self.user]
+        return DbDocument.data_base_cache.get(self.question, {}).get(self.user, {})
 
     def update(self, data) -> None:
+        if DbDocument.data_base_engine is not None:
+            return DbDocument.log_cache_data("update", self.question, self.user, data)
+
         DbDocument.read_cache_data()
         DbDocument.data_base_cache[self.question][self.user].update(data)
         DbDocument.write_cache_data()
 
+    def delete(self) -> None:
+        if DbDocument.data_base_engine is not None:
+            return DbDocument.log_cache_data("delete", self.question, self.user)
+
+        DbDocument.read_cache_data()
+        if self.question in DbDocument.data_base_cache:
+            DbDocument.data_base_cache[self.question].pop(self.user, None)
+        DbDocument.write_cache_data()
+
 
 class DbCollection:
     def __init__(self, question) -> None:
         self.question = question
 
     def document(self, user) -> None:
+        if DbDocument.data_base_engine is not None:  # Documents only exist once written in the log
+            return DbDocument(self.question, user)
+
         if self.question not in DbDocument.data_base_cache:
             DbDocument.data_base_cache[self.question] = {}
         if user not in DbDocument.data_base_cache[self.question]:
@@ -111,6 +158,52 @@ class DbCollection:
             return []
         return [DbDocument(self.question, user) for user in DbDocument.data_base_cache[self.question]]
 
+    def where(self, field, op, value):
+        return DbQuery(self, field, op, value)
+
+
+class DbQuery:
+    """Same api as a firestore query: documents of a collection with a filter on one field"""
+
+    operators = {
+        "<": operator.lt,
+        "<=": operator.le,
+        "==": operator.eq,
+        "!=": operator.ne,
+        ">=": operator.ge,
+        ">": operator.gt,
+    }
+
+    def __init__(self, collection, field, op, value) -> None:
+        self.collection, self.field, self.op, self.value = collection, field, op, value
+
+    def match(self, data):
+        return self.field in data and DbQuery.operators[self.op](data[self.field], self.value)
+
+    def stream(self):
+        return [d for d in self.collection.stream() if self.match(d.to_dict())]
+
+
+class DbBatch:
+    """Same api as firestore WriteBatch, writes are applied one by one on the local database"""
+
+    def __init__(self) -> None:
+        self.writes = []
+
+    def set(self, document, data) -> None:
+        self.writes.append((document.set, data))
+
+    def update(self, document, data) -> None:
+        self.writes.append((document.update, data))
+
+    def delete(self, document) -> None:
+        self.writes.append((document.delete, None))
+
+    def commit(self) -> None:
+        for func, data in self.writes:
+            func() if data is None else func(data)
+        self.writes = []
+
 
 class DbClient:
     def __init__(self) -> None:
@@ -119,6 +212,8 @@ class DbClient:
     def collection(self, question=None, question_id=None, cinfo=None):
         if question_id is None:
             question_id = get_question_id(question, cinfo=cinfo)
+        if DbDocument.data_base_client is not None:
+            return DbDocument.data_base_client.collection(question_id)
         if DbDocument.data_base_cache is None:
             from google.cloud import firestore
 
@@ -126,6 +221,15 @@ class DbClient:
         else:
             return DbCollection(question_id)
 
+    def batch(self):
+        if DbDocument.data_base_client is not None:
+            return DbDocument.data_base_client.batch()
+        if DbDocument.data_base_cache is None:
+            from google.cloud import firestore
+
+            return firestore.Client().batch()
+        return DbBatch()
+
 
 def init_config(config_id, cfg):
     collection = DbClient().collection(question_id=f"{cfg.subject}_info".replace("/", "_"))
@@ -189,7 +293,7 @@ The database has been reset to the local file '{cfg["database"]}'.
         datafile = cfg["global"]["data_cache"] if "data_cache" in cfg["global"] else cfg.database
         datafile = tools.abspath(datafile)
 
-        DbDocument.set_cache_data(datafile)
+        DbDocument.set_cache_data(datafile, storage=cfg["storage"])
 
     cfg = init_config("global", cfg)
 
@@ -254,6 +358,11 @@ def delete_documents(cinfo, questions, user=REF_USER, verbose=False):
         get_document(question_id=question_id, user=user, cinfo=cinfo).delete()
 
 
+def get_update_time():
+    """update_time of the documents (Paris time, one second resolution)"""
+    return datetime.datetime.now(tz=zoneinfo.ZoneInfo("Europe/Paris")).strftime("%Y-%m-%d %H:%M:%S")
+
+
 def send_answer_to_corrector(cinfo, update=True, comment="", update_time=True, **kwargs):
     source = "local@" if DbDocument.data_base_info is not None else "cloud@"
     question_alias = source + get_question_id(cinfo.cell_id, sep="/", cinfo=cinfo)
@@ -284,7 +393,7 @@ def send_answer_to_corrector(cinfo, update=True, comment="", update_time=True, *
                 )
             return
 
-    uptime = datetime.datetime.now(tz=zoneinfo.ZoneInfo("Europe/Paris")).strftime("%Y-%m-%d %H:%M:%S")
+    uptime = get_update_time()
 
     if update_time:
         kwargs.update({"update_time": uptime})
@@ -0,0 +1,212 @@
+# Grade all the students answers of a cell against a single teacher context
+
+import io
+import os
+import time
+import traceback
+import multiprocessing
+import multiprocessing.connection
+from contextlib import redirect_stdout, redirect_stderr
+import IPython
+
+try:
+    import resource
+except ImportError:  # Windows: no memory limit
+    resource = None
+
+from .cell_parser import CellParser
+from . import contexts
+from . import equals
+
+
+class BatchGrader:
+    def __init__(self, teacher_data, use_student_context=True) -> None:
+        self.teacher_data, self.use_student_context = teacher_data, use_student_context
+        self.evaluation_code = equals.get_evaluation_code(teacher_data)
+        self.do_debug = "debug=true" in self.evaluation_code.replace(" ", "").lower()
+        self.do_evaluate = "student." in self.evaluation_code
+
+        # The teacher context and the max score are the same for all the students
+        contexts.build_context(
+            teacher_data, "main_execution", "teacher", "teacher." in self.evaluation_code, do_debug=self.do_debug
+        )
+        self.max_score = equals.run_evaluation(
+            self.evaluation_code.replace("student.", "teacher."), stdout=False, reset=True
+        )
+
+        if not use_student_context:
+            self.evaluation_code = self.evaluation_code.replace("student.", "")
+
+    def evaluate(self, student_data):
+        contexts.build_context(
+            student_data,
+            "main_execution",
+            "student",
+            self.do_evaluate,
+            do_debug=self.do_debug,
+            use_context=self.use_student_context,
+        )
+        return equals.run_evaluation(self.evaluation_code, self.do_debug, reset=True)
+
+    def stream(self, students_data):
+        for user, student_data in students_data.items():
+            yield user, self.evaluate(student_data)
+
+    def evaluate_all(self, students_data):
+        """Return the scores {user: score}, None for the failing evaluations"""
+        return dict(self.stream(students_data))
+
+
+def exec_cell(code, namespace) -> None:
+    """Execute code in namespace as IPython.run_cell would (%magics and !commands are transformed)"""
+    from IPython.core.inputtransformer2 import TransformerManager
+
+    namespace.setdefault("get_ipython", IPython.get_ipython)
+    try:
+        exec(compile(TransformerManager().transform_cell(code), "<bulkhours>", "exec"), namespace)
+    except Exception:  # As in a notebook cell: the error is shown and the evaluation goes on
+        traceback.print_exc()
+
+
+def build_namespace_context(namespace, data, code_label, context, do_evaluate, do_debug=False, use_context=True):
+    """Same as contexts.build_context, in a namespace instead of the IPython kernel"""
+    if code_label not in data.minfo:
+        return
+
+    code = CellParser.remove_meta_functions_execution(data.get_code(code_label))
+
+    exec_cell(contexts.get_empty_context_code(context), namespace)
+    output_return = "None"
+    if not (code is None or len(code.replace("\n", "").replace(" ", "")) == 0):
+        fcode = code if not use_context or "compile_and_exec" in code else contexts.generate_context_code(code, context)
+
+        if do_debug:
+            print(f"Execute context {context}/{code_label}/{data.minfo['source']}")
+            exec_cell(fcode, namespace)
+        elif do_evaluate:
+            with redirect_stdout(f := io.StringIO()):
+                exec_cell(fcode, namespace)
+                output_return = f.getvalue()
+
+    exec_cell(f'{context}.stdout="""{output_return}"""', namespace)
+
+    if data.is_cell_type():
+        exec_cell(f'{context}.answer={data["answer"]}', namespace)
+
+
+def get_address_space():
+    """Virtual memory size of this process (bytes), 0 if unknown"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def set_memory_limit(memory_limit) -> None:
+    """The forked kernel already maps IPython, numpy, pandas...: the student gets memory_limit bytes on top of it"""
+    limit, hard = get_address_space() + memory_limit, resource.getrlimit(resource.RLIMIT_AS)[1]
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def evaluate_job(grader, student_data, connection) -> None:
+    if grader.memory_limit is not None and resource is not None:
+        set_memory_limit(grader.memory_limit)
+
+    with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+        build_namespace_context(
+            grader.namespace,
+            student_data,
+            "main_execution",
+            "student",
+            grader.do_evaluate,
+            do_debug=grader.do_debug,
+            use_context=grader.use_student_context,
+        )
+        os.environ.pop("FINAL_SCORE", None)
+        exec_cell(grader.evaluation_code, grader.namespace)
+
+    connection.send(float(os.environ["FINAL_SCORE"]) if "FINAL_SCORE" in os.environ else None)
+    connection.close()
+
+
+class ProcessGrader:
+    """Evaluate each student in a forked process, with a timeout and a memory limit (bytes) per student.
+    Workers start from a copy of the kernel namespace with the teacher context already built.
+    """
+
+    def __init__(self, teacher_data, processes=None, timeout=30, memory_limit=None, use_student_context=True):
+        self.processes, self.timeout, self.memory_limit = processes or os.cpu_count(), timeout, memory_limit
+        self.use_student_context = use_student_context
+        self.evaluation_code = equals.get_evaluation_code(teacher_data)
+        self.do_debug = "debug=true" in self.evaluation_code.replace(" ", "").lower()
+        self.do_evaluate = "student." in self.evaluation_code
+
+        self.namespace = dict(ipp.user_ns) if (ipp := IPython.get_ipython()) else {}
+        if "bulkhours" not in self.namespace:
+            exec_cell("import bulkhours", self.namespace)
+        with redirect_stdout(io.StringIO()):
+            build_namespace_context(
+                self.namespace,
+                teacher_data,
+                "main_execution",
+                "teacher",
+                "teacher." in self.evaluation_code,
+                do_debug=self.do_debug,
+            )
+
+            os.environ.pop("FINAL_SCORE", None)
+            exec_cell(self.evaluation_code.replace("student.", "teacher."), dict(self.namespace))
+            self.max_score = float(os.environ["FINAL_SCORE"]) if "FINAL_SCORE" in os.environ else None
+
+        if not use_student_context:
+            self.evaluation_code = self.evaluation_code.replace("student.", "")
+
+    @staticmethod
+    def is_available():
+        return "fork" in multiprocessing.get_all_start_methods()
+
+    def stream(self, students_data):
+        """Yield (user, score) as soon as each evaluation is over, score is None on failure or timeout"""
+        mp = multiprocessing.get_context("fork")
+        pending, running = list(students_data.items()), {}
+
+        while pending or running:
+            while pending and len(running) < self.processes:
+                user, student_data = pending.pop(0)
+                receiver, sender = mp.Pipe(duplex=False)
+                process = mp.Process(target=evaluate_job, args=(self, student_data, sender), daemon=True)
+                process.start()
+                sender.close()
+                running[receiver] = (user, process, time.time() + self.timeout)
+
+            timeout = max(0, min(deadline for _, _, deadline in running.values()) - time.time())
+            for receiver in multiprocessing.connection.wait(list(running), timeout=timeout):
+                user, process, _ = running.pop(receiver)
+                try:
+                    score = receiver.recv()
+                except EOFError:  # The worker died (memory limit, crash)
+                    score = None
+                receiver.close()
+                process.join()
+                yield user, score
+
+            for receiver, (user, process, deadline) in list(running.items()):
+                if deadline < time.time():
+                    process.terminate()
+                    process.join()
+                    receiver.close()
+                    del running[receiver]
+                    yield user, None
+
+    def evaluate_all(self, students_data):
+        """Return the scores {user: score}, None for the failing evaluations"""
+        return dict(self.stream(students_data))
+
+
+def get_grader(teacher_data, processes=0, timeout=30, memory_limit=None):
+    if processes and ProcessGrader.is_available():
+        return ProcessGrader(teacher_data, processes=processes, timeout=timeout, memory_limit=memory_limit)
+    return BatchGrader(teacher_data)
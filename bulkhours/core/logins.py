@@ -92,6 +92,11 @@ def init_env(packages=None, **kwargs):
      - A dict of config information. Only firestore config are functional for the moment. Examples:
     database = {"type": "service_account", ..., "universe_domain": "googleapis.com"}
 
+        :param storage: storage of a local database file:
+     - "json" (default): the json file is rewritten at each submission
+     - "log": the json file is a snapshot, submissions are appended in a '.log' file next to it
+     - "sqlite": the json file is migrated once in a '.sqlite' file, that can be shared by several kernels
+
         :param openai_token: to activate openai functionalities [chatgpt, dall-e]
         :param huggingface_token: to activate huggingface functionalities [chatgpt, dall-e]
         :param packages: packages to be installed from pip or apt-get
@@ -1,5 +1,7 @@
 import os
+import sys
 import json
+import importlib
 import ipywidgets
 import IPython
 from argparse import Namespace
@@ -16,11 +18,44 @@ def abspath(filename="", rdir=None, create_dir=True):
     return os.path.abspath(rdir + filename)
 
 
+class ConfigCache:
+    """Parsed '.safe' file, reloaded only when the file changes (mtime or size)"""
+
+    stamp, data = None, {}
+
+    @staticmethod
+    def get_stamp(jsonfile):
+        if not os.path.exists(jsonfile):
+            return None
+        stat = os.stat(jsonfile)
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def copy(data):
+        # Config is at most two levels deep ("global", notebooks): callers can mutate their copy freely
+        return {k: dict(v) if type(v) == dict else v for k, v in data.items()}
+
+    @staticmethod
+    def read(jsonfile):
+        if (stamp := ConfigCache.get_stamp(jsonfile)) != ConfigCache.stamp:
+            ConfigCache.data = {}
+            if stamp is not None:
+                with open(jsonfile) as json_file:
+                    ConfigCache.data = json.load(json_file)
+            ConfigCache.stamp = stamp
+        return ConfigCache.copy(ConfigCache.data)
+
+    @staticmethod
+    def write(jsonfile, data):
+        with open(jsonfile, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+        ConfigCache.data, ConfigCache.stamp = ConfigCache.copy(data), ConfigCache.get_stamp(jsonfile)
+
+
 def update_config(config):
     data = config.data if hasattr(config, "data") else config
 
-    with open(abspath(".safe"), "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    ConfigCache.write(abspath(".safe"), data)
     return config
 
 
@@ -77,9 +112,8 @@ def get_config(config=None, do_update=False, from_scratch=False, is_namespace=Fa
     """Important to copy the config"""
     if config is None:
         config = {}  # Config()
-        if os.path.exists(jsonfile := abspath(".safe")) and not from_scratch:
-            with open(jsonfile) as json_file:
-                config.update(json.load(json_file))
+        if not from_scratch:
+            config.update(ConfigCache.read(abspath(".safe")))
 
     # Convert from Namespace
     if type(config) != dict:
@@ -90,8 +124,7 @@ def get_config(config=None, do_update=False, from_scratch=False, is_namespace=Fa
         config["email"] = config["email"].lower()
 
     if do_update:
-        with open(abspath(".safe"), "w", encoding="utf-8") as f:
-            json.dump(config, f, ensure_ascii=False, indent=4)
+        ConfigCache.write(abspath(".safe"), config)
 
     if is_namespace:
         return Namespace(**config)
@@ -121,3 +154,24 @@ def is_admin(config=None):
         and "admins" in config["global"]
         and config["email"] in config["global"]["admins"]
     )
+
+
+def lazy_loader(package, submodules=(), attributes=None):
+    """PEP 562 module __getattr__ and __dir__: the submodules and the attributes {name: submodule}
+    of a package are only imported at first access
+    """
+    attributes = {} if attributes is None else attributes
+
+    def __getattr__(name):
+        if name in submodules:
+            return importlib.import_module(f".{name}", package)
+        if name in attributes:
+            value = getattr(importlib.import_module(f".{attributes[name]}", package), name)
+            setattr(sys.modules[package], name, value)
+            return value
+        raise AttributeError(f"module '{package}' has no attribute '{name}'")
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(submodules) | set(attributes))
+
+    return __getattr__, __dir__
@@ -1,6 +1,7 @@
 import IPython
 import ipywidgets
 from .tools import md
+from . import tools
 import numpy as np
 import sys
 from .cell_parser import CellParser
@@ -8,6 +9,7 @@ from .line_parser import LineParser
 from . import buttons
 from . import equals
 from . import contexts
+from . import grading
 
 
 class WidgetBase:
@@ -69,12 +71,20 @@ class WidgetBase:
         users = users.set_index("mail")[["nom", "prenom", self.cinfo.cell_id + ".n"]]
 
         answers = admin.answers.get_answers(self.cinfo.cell_id, verbose=False)
-        for user, answer in answers.items():
-            student_data = CellParser.crunch_data(self.cinfo, user=user, data=answer)
-            score = equals.evaluate_student(student_data, teacher_data, raw=True)
+        students_data = {
+            user: CellParser.crunch_data(self.cinfo, user=user, data=answer) for user, answer in answers.items()
+        }
+        config = tools.get_config(is_new_format=True)
+        grader = grading.get_grader(
+            teacher_data,
+            processes=config.g.get("grading_workers", 0),
+            memory_limit=config.g.get("grading_memory_limit") or None,
+        )
 
-            users.loc[user, self.cinfo.cell_id + ".n"] = score
-            admin.answers.update_note(self.cinfo.cell_id, user, score)
+        notes = {}
+        for user, score in grader.stream(students_data):
+            notes[user] = users.loc[user, self.cinfo.cell_id + ".n"] = score
+        admin.answers.update_notes(self.cinfo.cell_id, notes)
 
         IPython.display.display(admin.tools.styles(users))
 
@@ -2,18 +2,22 @@ from os.path import dirname, basename, isfile, join
 import glob
 
 modules = glob.glob(join(dirname(__file__), "*.py"))
-modules = [
-    basename(f)[:-3]
-    for f in modules
-    if isfile(f) and basename(f)[:-3] not in ["data_parser", "__init__", "help", "datasets"]
-]
+tools_modules = "__init__ help datasets data_parser download_cache dataset_cache h5_dataset geometry_store".split()
+tools_modules += ["embedded_bundle", "dataset_catalog"]
+modules = [basename(f)[:-3] for f in modules if isfile(f) and basename(f)[:-3] not in tools_modules]
 __all__ = modules
 from . import *
 from .help import build_readme, help, generate_header_links  # noqa
 from .data_parser import DataParser  # noqa
+from .download_cache import DownloadCache  # noqa
+from .dataset_cache import DatasetCache  # noqa
+from .h5_dataset import H5Array, H5Files  # noqa
+from .geometry_store import GeometryStore  # noqa
+from .embedded_bundle import EmbeddedBundle, build_bundle  # noqa
+from .dataset_catalog import DatasetCatalog  # noqa
 
 
-def get_data(label, **kwargs):
+def get_data(label, use_cache=True, **kwargs):
     DataParser.build_clean_datasets()
 
     data_info = (
@@ -22,7 +26,7 @@ def get_data(label, **kwargs):
         else {"label": label, "raw_data": label, **kwargs}
     )
 
-    return DataParser(**data_info).get_data()
+    return DataParser(**data_info).get_data(use_cache=use_cache)
 
 
 def get_image(label, ax=None):
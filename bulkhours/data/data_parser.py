@@ -5,6 +5,13 @@ import numpy as np
 import pandas as pd
 import IPython
 import inspect
+import concurrent.futures
+
+from .download_cache import DownloadCache
+from .dataset_cache import DatasetCache
+from .h5_dataset import H5Array
+from .embedded_bundle import EmbeddedBundle
+from .dataset_catalog import DatasetCatalog
 
 
 def get_rdata(rdata):
@@ -64,55 +71,103 @@ def clean_data(df, query=None, index=None, test_data=None):
     return df
 
 
-def get_data_from_file(raw_data, **kwargs):
-    if "http" in raw_data:
-        filename = raw_data
+def downcast_columns(df, floats=True, max_categories=0.5):
+    """float32/smallest integers for the numbers, category for the repeated strings (country names...)"""
+    for c in df.columns:
+        if floats and df[c].dtype == np.float64:
+            df[c] = pd.to_numeric(df[c], downcast="float")
+        elif df[c].dtype == np.int64:
+            df[c] = pd.to_numeric(df[c], downcast="integer")
+        elif pd.api.types.is_string_dtype(df[c].dtype) and len(df) and df[c].nunique() <= max_categories * len(df):
+            df[c] = df[c].astype("category")
+    return df
+
 
-        nfilename = filename.split("/")[-1]
+def read_csv_chunks(filename, chunksize, query=None, downcast=False, **kwargs):
+    """Streaming read: the query is applied to each chunk, the peak memory follows the size of the result"""
+    chunks = []
+    for chunk in pd.read_csv(filename, chunksize=chunksize, **kwargs):
+        if "date" in chunk.columns:
+            chunk["date"] = pd.to_datetime(chunk["date"])
+        if query:
+            chunk = chunk.query(query)
+        chunks.append(downcast_columns(chunk, max_categories=0) if downcast else chunk)
 
-        if 1:  # os.path.exists(nfilename):
-            import urllib.request
+    return pd.concat(chunks) if len(chunks) else pd.read_csv(filename, nrows=0, **kwargs)
 
-            urllib.request.urlretrieve(filename, nfilename)
-        filename = nfilename
 
+def get_data_from_file(raw_data, **kwargs):
+    if "http" in raw_data:
+        url = raw_data
     else:
-        filename = None
+        url = None
         directory = os.path.abspath(os.path.dirname(__file__) + "../../../data")
         hf_files = ["brown.gif", "Evaluation.gif"]
 
         if len((files := glob.glob(gfile := f"{directory}/{raw_data}*"))):
             filename = files[0]
         elif raw_data in hf_files:
-            filename = f"https://huggingface.co/datasets/guydegnol/bulkhours/resolve/main/{raw_data}"
+            url = f"https://huggingface.co/datasets/guydegnol/bulkhours/resolve/main/{raw_data}"
         else:
             print(f"No data available for {raw_data} ({gfile})")
             return None
 
-    import h5py
+    if url is not None and (filename := DownloadCache().get(url)) is None:
+        print(f"No data available for {url} (offline and not cached)")
+        return None
 
     ext = filename.split(".")[-1]
     if ext in ["xlsx", "xls"]:
         # kwargs = {k: v for k, v in kwargs.items() if k not in ["summary", "category"]}
         return pd.read_excel(filename)  # , **kwargs)
-    elif ext == "tsv":
-        return pd.read_csv(filename, sep="\t")
-    elif ext in ["csv"]:
-        return pd.read_csv(filename)
+    elif ext in ["csv", "tsv"]:
+        read_info = dict(sep="\t" if ext == "tsv" else ",", usecols=kwargs.get("usecols"))
+        if (chunksize := kwargs.get("chunksize")) is None:
+            df = pd.read_csv(filename, **read_info)
+        else:
+            df = read_csv_chunks(filename, chunksize, kwargs.get("query"), kwargs.get("downcast"), **read_info)
+        return downcast_columns(df) if kwargs.get("downcast") else df
     elif ext in ["h5"]:
+        # lazy=True: slices are read on demand (H5Array), the file handles are shared by H5Files
         if "key" in kwargs:
-            return np.array(h5py.File(filename, "r")[kwargs["key"]][:])
+            array = H5Array(filename, kwargs["key"])
+            return array if kwargs.get("lazy") else np.asarray(array)
         elif "format" in kwargs and kwargs["format"] == "filename":
             return filename
         else:
-            return h5py.File(filename, "r")
+            import h5py
+
+            return h5py.File(filename, "r")  # Owned by the caller: not closed by the H5Files pool
     else:
         return filename
 
 
+def get_fingerprint(raw_data, download=True):
+    """Version of the source files: (path, mtime, size) for the local files, ETag and size for the remote ones
+    (download=False: only the files already in the download cache, without request)
+    """
+    if type(raw_data) == list:
+        fingerprints = [get_fingerprint(r, download=download) for r in raw_data]
+        return None if None in fingerprints else fingerprints
+
+    if "http" in raw_data:
+        cache = DownloadCache()
+        if (filename := cache.get(raw_data) if download else cache.get_filenames(raw_data)[0]) is None:
+            return None
+        if not (metadata := cache.get_metadata(raw_data)):
+            return None
+        return raw_data, metadata.get("etag"), metadata.get("last_modified"), os.path.getsize(filename)
+
+    directory = os.path.abspath(os.path.dirname(__file__) + "../../../data")
+    if len(files := glob.glob(f"{directory}/{raw_data}*")) == 0:
+        return None
+    return files[0], (stat := os.stat(files[0])).st_mtime_ns, stat.st_size
+
+
 class DataParser:
     datasets = OrderedDict()
     clean_datasets = OrderedDict()
+    max_workers = 8
 
     @staticmethod
     def get_data_from_file(raw_data, **kwargs):
@@ -176,15 +231,25 @@ class DataParser:
 
         return wrap
 
-    def get_info(self, load_columns=False, summary=False):
-        columns = None
-        if load_columns:
-            try:
-                data = self.get_data(credit=False)
-                columns = list(data.columns)
-            except:
-                pass
+    def get_catalog_key(self):
+        if self.raw_data is None:
+            return self.get_info_key()
+        return self.get_info_key(get_fingerprint(self.raw_data, download=False))
 
+    def get_schema(self, load=True):
+        """Catalog entry of the dataset: with load=True, the data is loaded only if its source changed"""
+        if (entry := DatasetCatalog.get(self.label, self.get_catalog_key())) is not None or not load:
+            return entry
+
+        try:
+            data = self.get_data(credit=False)
+        except Exception:
+            return None
+        return DatasetCatalog.put(self.label, self.get_catalog_key(), data)  # The remote files are now fingerprinted
+
+    def get_info(self, load_columns=False, summary=False):
+        """Markdown description: the data is loaded (load_columns is kept for compatibility) only when the
+        catalog has no up to date schema of the dataset"""
         d = self.data_info
         comment = ""
         if "summary" in d:
@@ -209,17 +274,10 @@ class DataParser:
 
         if "columns_description" in d:
             cols += f"\n{d['columns_description']}\n"
-        else:
-            if columns is None:
-                try:
-                    data = self.get_data(credit=False)
-                    columns = list(data.columns)
-                except:
-                    pass
-            if columns is not None:
-                cols += """\n| Column   |      Info |\n|-----------|:-----------|\n"""
-                for c in columns:
-                    cols += f"| {c} |  |\n"
+        elif (schema := self.get_schema()) is not None and schema["columns"] is not None:
+            cols += f"""\n{schema['rows']} rows\n\n| Column   |      Info |\n|-----------|:-----------|\n"""
+            for c, dtype in zip(schema["columns"], schema["dtypes"]):
+                cols += f"| {c} | {dtype} |\n"
 
         if cols != "":
             comment += f"""\n<details>\n<summary>Show columns info</summary>\n{cols}\n</details>\n\n"""
@@ -230,23 +288,31 @@ class DataParser:
             )
         return comment
 
-    def read_raw_data(self, raw_data):
+    def read_raw_data(self, raw_data, **kwargs):
         if type(raw_data) == list:
+            # The parts are downloaded and parsed concurrently (io and C parsers release the GIL)
+            with concurrent.futures.ThreadPoolExecutor(min(len(raw_data), DataParser.max_workers)) as executor:
+                dfs = list(executor.map(lambda f: get_data_from_file(f, **self.data_info, **kwargs), raw_data))
+
             if self.on:
-                return pd.concat(
-                    [get_data_from_file(f, **self.data_info).set_index(self.on) for f in raw_data], axis=1
-                )
+                return pd.concat([df.set_index(self.on) for df in dfs], axis=1)
             else:
-                return pd.concat([get_data_from_file(f, **self.data_info) for f in raw_data], axis=1)
+                return pd.concat(dfs, axis=1)
 
-        return get_data_from_file(raw_data, **self.data_info)
+        return get_data_from_file(raw_data, **self.data_info, **kwargs)
 
-    def get_data(self, credit=None):
-        if self.func is not None:
-            df = self.func(self)
-        else:
-            df = self.read_raw_data(self.raw_data)
+    def get_cache_key(self):
+        # Datasets built without source file (scraping, random data) are not cached
+        if not DatasetCache.enabled or self.raw_data is None or (fingerprint := get_fingerprint(self.raw_data)) is None:
+            return None
 
+        return self.get_info_key(fingerprint)
+
+    def get_info_key(self, *fingerprint):
+        info = [self.query, self.index, self.test_data, self.drop, self.rename, self.on, self.is_test]
+        return DatasetCache.get_key(self.label, self.raw_data, info, sorted(self.data_info.items()), *fingerprint)
+
+    def show_credit(self, credit=None):
         credit = credit if credit is not None else self.credit
 
         if credit:
@@ -262,23 +328,46 @@ class DataParser:
             elif not (".gif" in self.label or ".png" in self.label):
                 print(f"Data {self.label} is not referenced")
 
+    def get_data(self, credit=None, use_cache=True):
+        key = self.get_cache_key() if use_cache else None
+        if key is not None and (df := DatasetCache.get(key)) is not None:
+            self.show_credit(credit)
+            return df
+
+        # Tables embedded in the code are read from the parquet bundle built by embedded_bundle.build_bundle
+        if (
+            use_cache
+            and self.raw_data is None
+            and (df := EmbeddedBundle.get(self.label, self.get_info_key())) is not None
+        ):
+            self.show_credit(credit)
+            return df
+
+        # Streaming mode (get_data(label, chunksize=..., usecols=..., downcast=True)): the query is applied to
+        # each chunk when the columns are not modified before it
+        pushdown = "chunksize" in self.data_info and self.func is None and type(self.raw_data) == str
+        pushdown = pushdown and self.query and self.drop is None and self.rename is None and self.is_test is None
+
+        if self.func is not None:
+            df = self.func(self)
+        else:
+            df = self.read_raw_data(self.raw_data, query=self.query if pushdown else None)
+
+        self.show_credit(credit)
+
         if type(df) == str:
             return df
 
         df = clean_columns(df, drop=self.drop, rename=self.rename, is_test=self.is_test)
-        return clean_data(df, query=self.query, index=self.index, test_data=self.test_data)
+        df = clean_data(df, query=None if pushdown else self.query, index=self.index, test_data=self.test_data)
+        if key is not None:
+            DatasetCache.put(key, df)
+        return df
 
     def get_image(self, ax=None):
         from PIL import Image
 
         filename = self.read_raw_data(self.label)
-        if "http" in filename:
-            import urllib.request
-
-            nfilename = filename.split("/")[-1]
-            urllib.request.urlretrieve(filename, nfilename)
-            filename = nfilename
-
         img = Image.open(filename)
         if not ax:
             return img
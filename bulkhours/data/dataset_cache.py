@@ -0,0 +1,105 @@
+import os
+import json
+import hashlib
+from collections import OrderedDict
+import pandas as pd
+
+from ..core import tools
+
+
+class DatasetCache:
+    """Cleaned datasets of get_data keyed by (label, kwargs, source fingerprint): kept in memory up to max_bytes
+    and spilled as parquet files in data/cache/datasets/, so that a new kernel reloads them without parsing.
+    The cache only gives copies: mutating a result can't change it.
+    """
+
+    data, nbytes = OrderedDict(), 0
+    directory, max_bytes, enabled = None, 512 * 1024**2, True
+
+    @staticmethod
+    def is_available():
+        try:
+            import pyarrow  # noqa
+
+            return True
+        except ImportError:
+            return False
+
+    @staticmethod
+    def get_key(*args):
+        return hashlib.sha256(repr(args).encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def get_filename(key):
+        directory = DatasetCache.directory or tools.abspath("data/cache/datasets/")
+        return os.path.join(directory, key + ".parquet")
+
+    @staticmethod
+    def store(key, df) -> None:
+        if (nbytes := int(df.memory_usage(deep=True).sum())) > DatasetCache.max_bytes:
+            return
+
+        if key in DatasetCache.data:
+            DatasetCache.nbytes -= DatasetCache.data.pop(key)[1]
+        DatasetCache.data[key] = (df, nbytes)
+        DatasetCache.nbytes += nbytes
+
+        while DatasetCache.nbytes > DatasetCache.max_bytes:
+            DatasetCache.nbytes -= DatasetCache.data.popitem(last=False)[1][1]
+
+    @staticmethod
+    def get(key):
+        if key in DatasetCache.data:
+            DatasetCache.data.move_to_end(key)
+            return DatasetCache.data[key][0].copy()
+
+        if not os.path.exists(filename := DatasetCache.get_filename(key)) or not DatasetCache.is_available():
+            return None
+        import pyarrow.parquet
+
+        try:
+            table = pyarrow.parquet.read_table(filename)
+        except (OSError, ValueError):  # Truncated or unreadable file: parse the dataset again
+            return None
+        df, info = table.to_pandas(), json.loads((table.schema.metadata or {}).get(b"bulkhours", b"{}"))
+        if info.get("freq") is not None:  # Not stored by parquet, needed by the time series models
+            df.index.freq = info["freq"]
+        df.attrs.update(info.get("attrs", {}))
+
+        DatasetCache.store(key, df)
+        return df.copy()
+
+    @staticmethod
+    def put(key, df) -> None:
+        if not isinstance(df, pd.DataFrame):
+            return
+
+        DatasetCache.store(key, df := df.copy())
+
+        # Parquet only for plain dataframes (no GeoDataFrame) with supported columns
+        if type(df) is not pd.DataFrame or not DatasetCache.is_available():
+            return
+
+        import pyarrow
+        import pyarrow.parquet
+
+        tmpname = f"{(filename := DatasetCache.get_filename(key))}.{os.getpid()}.tmp"
+        try:
+            # The index freq and the attrs (json) are saved in the schema metadata: a cache hit equals a fresh read
+            table = pyarrow.Table.from_pandas(df)
+            info = json.dumps(dict(freq=getattr(df.index, "freqstr", None), attrs=df.attrs)).encode("utf-8")
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"bulkhours": info})
+            pyarrow.parquet.write_table(table, tmpname)
+            os.replace(tmpname, filename)
+        except (ValueError, TypeError, NotImplementedError):
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+
+    @staticmethod
+    def clear(memory=True, disk=False) -> None:
+        if memory:
+            DatasetCache.data, DatasetCache.nbytes = OrderedDict(), 0
+        if disk and os.path.exists(directory := os.path.dirname(DatasetCache.get_filename(""))):
+            for f in os.listdir(directory):
+                if f.endswith(".parquet"):
+                    os.remove(os.path.join(directory, f))
@@ -0,0 +1,51 @@
+import os
+import json
+
+from ..core import tools
+
+
+class DatasetCatalog:
+    """Schema of the datasets (columns, dtypes, number of rows) saved in data/cache/catalog/index.json: help() and
+    build_readme() render it without loading the data. An entry is recorded with the key of the dataset (arguments
+    and source fingerprint) and is loaded again only when this key changes.
+    """
+
+    entries, directory = None, None
+
+    @staticmethod
+    def get_filename():
+        directory = DatasetCatalog.directory or tools.abspath("data/cache/catalog/")
+        return os.path.join(directory, "index.json")
+
+    @staticmethod
+    def get_entries():
+        if DatasetCatalog.entries is None:
+            DatasetCatalog.entries = {}
+            if os.path.exists(filename := DatasetCatalog.get_filename()):
+                try:
+                    with open(filename) as f:
+                        DatasetCatalog.entries = json.load(f)
+                except ValueError:  # Truncated file: the schemas are captured again
+                    pass
+        return DatasetCatalog.entries
+
+    @staticmethod
+    def get(label, key):
+        if (entry := DatasetCatalog.get_entries().get(label)) is None or entry["key"] != key:
+            return None
+        return entry
+
+    @staticmethod
+    def put(label, key, data):
+        """Record the schema of data (columns is None for the datasets which are not dataframes)"""
+        entry = dict(key=key, columns=None, dtypes=None, rows=None)
+        if hasattr(data, "columns") and hasattr(data, "dtypes"):
+            entry.update(columns=[str(c) for c in data.columns], dtypes=[str(t) for t in data.dtypes], rows=len(data))
+
+        if DatasetCatalog.get_entries().get(label) != entry:
+            DatasetCatalog.entries[label] = entry
+            os.makedirs(os.path.dirname(filename := DatasetCatalog.get_filename()), exist_ok=True)
+            with open(tmpname := f"{filename}.{os.getpid()}.tmp", "w") as f:
+                json.dump(DatasetCatalog.entries, f, indent=1, sort_keys=True)
+            os.replace(tmpname, filename)
+        return entry
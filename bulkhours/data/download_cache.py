@@ -0,0 +1,100 @@
+import os
+import json
+import contextlib
+import time
+import threading
+import hashlib
+import urllib.error
+import urllib.request
+
+from ..core import tools
+
+
+class DownloadCache:
+    """Remote datasets stored once in data/cache/downloads/ (one file per url hash, plus its ETag/Last-Modified
+    metadata). A cached file is revalidated with a conditional request after max_age seconds and the least
+    recently used files are evicted above max_size bytes. Offline (BLK_OFFLINE=1), only the cache is used.
+    """
+
+    directory, max_size, max_age, timeout = None, 2 * 1024**3, 3600, 30
+
+    def __init__(self, directory=None, max_size=None, max_age=None, offline=None) -> None:
+        directory = directory or DownloadCache.directory or tools.abspath("data/cache/downloads/", create_dir=False)
+        self.directory = directory if directory.endswith("/") else directory + "/"  # Created by the first write
+
+        self.max_size = DownloadCache.max_size if max_size is None else max_size
+        self.max_age = DownloadCache.max_age if max_age is None else max_age
+        self.offline = os.environ.get("BLK_OFFLINE", "0") not in ["", "0"] if offline is None else offline
+
+    def get_filenames(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        ext = os.path.splitext(url.split("?")[0].split("/")[-1])[1]  # Readers use the extension
+        return self.directory + key + ext, self.directory + key + ".meta"
+
+    @staticmethod
+    def write(filename, data, mode="wb") -> None:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(tmpname := f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp", mode) as f:
+            f.write(data)
+        os.replace(tmpname, filename)
+
+    def get_metadata(self, url):
+        filename, metaname = self.get_filenames(url)
+        if not (os.path.exists(filename) and os.path.exists(metaname)):
+            return {}
+        with open(metaname) as f:
+            return json.load(f)
+
+    def get(self, url):
+        """Return the local filename of url (None if it is not available)"""
+        filename, metaname = self.get_filenames(url)
+        if metadata := self.get_metadata(url):
+            if self.offline or time.time() - metadata.get("checked", 0) < self.max_age:
+                os.utime(filename)
+                return filename
+
+        if self.offline:
+            return None
+
+        headers = {}
+        if "etag" in metadata:
+            headers["If-None-Match"] = metadata["etag"]
+        if "last_modified" in metadata:
+            headers["If-Modified-Since"] = metadata["last_modified"]
+
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=self.timeout) as r:
+                self.write(filename, r.read())
+                metadata = dict(url=url, etag=r.headers.get("ETag"), last_modified=r.headers.get("Last-Modified"))
+                metadata = {k: v for k, v in metadata.items() if v is not None}
+        except OSError as e:  # HTTP or network error (urllib.error.URLError is an OSError)
+            if not metadata:  # A stale file is better than nothing
+                raise
+            if getattr(e, "code", None) != 304:  # 304: not modified
+                print(f"\x1b[31mCan't revalidate {url}, the cached file is used\x1b[0m")
+
+        metadata["checked"] = time.time()
+        self.write(metaname, json.dumps(metadata), mode="w")
+        os.utime(filename)
+        self.evict(keep=filename)
+        return filename
+
+    def evict(self, keep=None) -> None:
+        # Other readers (threads of read_raw_data, kernels) can evict the same files at the same time
+        files = []
+        for f in os.scandir(self.directory):
+            if not f.name.endswith((".meta", ".tmp")):
+                with contextlib.suppress(FileNotFoundError):
+                    files.append((f.stat().st_mtime, f.stat().st_size, f.path))
+
+        size = sum(s for _, s, _ in files)
+        for _, fsize, filename in sorted(files):
+            if size <= self.max_size:
+                break
+            if filename == keep:
+                continue
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(filename)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.splitext(filename)[0] + ".meta")
+            size -= fsize
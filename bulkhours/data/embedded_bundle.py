@@ -0,0 +1,78 @@
+import os
+import json
+
+import pandas as pd
+
+
+class EmbeddedBundle:
+    """Tables embedded in the source of the data modules (StringIO and list literals of gmacro, france...),
+    parsed once by build_bundle() into data/embedded/ (one parquet file per dataset, shipped with the package).
+    A dataset is read from the bundle only if its code and arguments did not change since the build.
+    """
+
+    directory = os.path.join(os.path.dirname(__file__), "embedded")
+    modules, index = ["gmacro", "france", "statsdata", "mincer"], None
+    live_datasets = ["statsdata.hhousing"]  # Downloaded at each call
+
+    @staticmethod
+    def is_embedded(data_info):
+        if data_info.get("raw_data") is not None or data_info.get("func") is None:
+            return False
+        if data_info["label"] in EmbeddedBundle.live_datasets:
+            return False
+        return data_info["func"].__module__.split(".")[-1] in EmbeddedBundle.modules
+
+    @staticmethod
+    def get_index():
+        if EmbeddedBundle.index is None:
+            EmbeddedBundle.index = {}
+            if os.path.exists(filename := os.path.join(EmbeddedBundle.directory, "index.json")):
+                with open(filename) as f:
+                    EmbeddedBundle.index = json.load(f)
+        return EmbeddedBundle.index
+
+    @staticmethod
+    def get(label, key):
+        if (info := EmbeddedBundle.get_index().get(label, {})).get("key") != key:
+            return None
+
+        try:
+            df = pd.read_parquet(os.path.join(EmbeddedBundle.directory, f"{key}.parquet"))
+        except (ImportError, OSError, ValueError):  # No pyarrow: the dataset is parsed from the source
+            return None
+
+        if info.get("freq") is not None:  # Not stored by parquet, needed by the time series models
+            df.index.freq = info["freq"]
+        return df
+
+
+def build_bundle(verbose=True):
+    """Parse all the embedded datasets and write them in data/embedded/"""
+    from .data_parser import DataParser
+
+    DataParser.build_clean_datasets()
+    EmbeddedBundle.index = {}
+    os.makedirs(EmbeddedBundle.directory, exist_ok=True)
+    for f in os.listdir(EmbeddedBundle.directory):
+        os.remove(os.path.join(EmbeddedBundle.directory, f))
+
+    index = {}
+    for label, data_info in DataParser.clean_datasets.items():
+        if not EmbeddedBundle.is_embedded(data_info):
+            continue
+
+        data = DataParser(**data_info)
+        try:
+            if not isinstance(df := data.get_data(credit=False, use_cache=False), pd.DataFrame):
+                continue
+            df.to_parquet(os.path.join(EmbeddedBundle.directory, f"{(key := data.get_info_key())}.parquet"))
+            index[label] = dict(key=key, freq=getattr(df.index, "freqstr", None))
+        except Exception as e:  # The dataset is still parsed from the source
+            print(f"\x1b[31m{label} is not bundled:\x1b[0m {e}")
+
+    with open(os.path.join(EmbeddedBundle.directory, "index.json"), "w") as f:
+        json.dump(index, f, indent=4, sort_keys=True)
+    EmbeddedBundle.index = index
+
+    if verbose:
+        print(f"{len(index)} datasets bundled in {EmbeddedBundle.directory}")
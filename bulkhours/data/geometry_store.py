@@ -0,0 +1,62 @@
+import os
+import pandas as pd
+
+from ..core import tools
+
+
+class GeometryStore:
+    """Country geometries (Natural Earth low resolution, without Antarctica) and continents, loaded once per kernel.
+    The geometries are also saved as GeoParquet in data/cache/geometries/: a new kernel does not parse the shapefile.
+    """
+
+    world, continents, directory = None, None, None
+    renames = {"United States": "United States of America", "Democratic Republic of Congo": "Dem. Rep. Congo"}
+
+    @staticmethod
+    def get_filename():
+        directory = GeometryStore.directory or tools.abspath("data/cache/geometries/")
+        return os.path.join(directory, "naturalearth_lowres.parquet")
+
+    @staticmethod
+    def load_world():
+        import geopandas as gpd
+
+        if os.path.exists(filename := GeometryStore.get_filename()):
+            try:
+                return gpd.read_parquet(filename)
+            except (ImportError, OSError, ValueError):
+                pass
+
+        world = gpd.read_file(gpd.datasets.get_path("naturalearth_lowres"))
+        world = world[(world.pop_est > 0) & (world.name != "Antarctica")]
+        try:
+            world.to_parquet(tmpname := f"{filename}.{os.getpid()}.tmp")
+            os.replace(tmpname, filename)
+        except (ImportError, ValueError):  # No pyarrow: the geometries are only kept in memory
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+        return world
+
+    @staticmethod
+    def get_world():
+        """Shared GeoDataFrame: it must not be modified (merge and copy return new frames)"""
+        if GeometryStore.world is None:
+            GeometryStore.world = GeometryStore.load_world()
+        return GeometryStore.world
+
+    @staticmethod
+    def get_continents():
+        if GeometryStore.continents is None:
+            from .data_parser import DataParser
+
+            GeometryStore.continents = DataParser.get_data_from_file("continent.tsv")
+        return GeometryStore.continents
+
+    @staticmethod
+    def normalize_countries(countries):
+        """Natural Earth names of a series of countries (exact names: normalizing twice changes nothing).
+        The renaming is applied to the distinct names only.
+        """
+        codes, names = pd.factorize(countries)
+        names = pd.Series(names).replace(GeometryStore.renames)
+        return names.reindex(codes).set_axis(countries.index).rename(countries.name)
@@ -0,0 +1,103 @@
+import os
+import atexit
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+from ..core import tools
+
+
+class H5Files:
+    """Pool of the opened h5 files (read only): at most max_files handles, the least recently used is closed first
+    and all of them are closed at exit.
+    """
+
+    files, max_files = OrderedDict(), 8
+
+    @staticmethod
+    def get(filename):
+        import h5py
+
+        # A replaced file (new download) gets a new handle
+        key = (os.path.abspath(filename), os.stat(filename).st_mtime_ns)
+        if key in H5Files.files:
+            H5Files.files.move_to_end(key)
+            return H5Files.files[key]
+
+        H5Files.files[key] = h5py.File(filename, "r")
+        while len(H5Files.files) > H5Files.max_files:
+            H5Files.files.popitem(last=False)[1].close()
+        return H5Files.files[key]
+
+    @staticmethod
+    def close() -> None:
+        while len(H5Files.files):
+            H5Files.files.popitem()[1].close()
+
+
+atexit.register(H5Files.close)
+
+
+class H5Array:
+    """Lazy array on a h5 dataset: only the requested slices are read from the file.
+    np.asarray(a) reads everything, a.to_memmap() exports it once to a .npy file mapped in memory (in
+    data/cache/memmaps/ by default: the h5 file may be in a read only directory).
+    """
+
+    directory = None
+
+    def __init__(self, filename, key) -> None:
+        self.filename, self.key = filename, key
+        dataset = self.get_dataset()
+        self.shape, self.dtype = dataset.shape, dataset.dtype
+
+    def get_dataset(self):
+        return H5Files.get(self.filename)[self.key]
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, index):
+        return self.get_dataset()[index]
+
+    def __array__(self, dtype=None, copy=None):
+        data = self.get_dataset()[()]
+        return data if dtype is None else data.astype(dtype)
+
+    def __repr__(self):
+        return f"H5Array('{os.path.basename(self.filename)}', key='{self.key}', shape={self.shape}, dtype={self.dtype})"
+
+    def iter_batches(self, batch_size=64):
+        for start in range(0, len(self), batch_size):
+            yield self[start : start + batch_size]
+
+    def get_memmap_filename(self):
+        directory = H5Array.directory or tools.abspath("data/cache/memmaps/", create_dir=False)
+        source = hashlib.sha1(os.path.abspath(self.filename).encode()).hexdigest()[:16]  # Same basename, other dir
+        return os.path.join(directory, f"{os.path.basename(self.filename)}.{source}.{self.key.replace('/', '.')}.npy")
+
+    def to_memmap(self, filename=None, batch_size=1024):
+        """Read only np.memmap of the dataset, written by batches (the file is reused if it is newer than the h5)"""
+        filename = filename or self.get_memmap_filename()
+
+        if not os.path.exists(filename) or os.path.getmtime(filename) < os.path.getmtime(self.filename):
+            os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+            array = np.lib.format.open_memmap(tmpname := f"{filename}.{os.getpid()}.tmp", "w+", self.dtype, self.shape)
+            if self.ndim == 0:
+                array[()] = self[()]
+            else:
+                for start in range(0, len(self), batch_size):
+                    array[start : start + batch_size] = self[start : start + batch_size]
+            array.flush()
+            del array
+            os.replace(tmpname, filename)
+
+        return np.load(filename, mmap_mode="r")
@@ -93,7 +93,13 @@ def build_readme(category=None, load_data=True, save_datasets=True, save_example
 
     from ..phyu.constants import Units
 
+    # Datasets grouped by category in a single pass, the columns are read from the DatasetCatalog (a dataset is
+    # loaded only when its entry is missing or outdated)
     DataParser.build_clean_datasets()
+    datasets = {}
+    for k, d in DataParser.clean_datasets.items():
+        datasets.setdefault(d.get("category"), []).append(d)
+
     if category is not None:
         readme = ""
         for c, lcategory in enumerate(datacategories):
@@ -105,9 +111,8 @@ def build_readme(category=None, load_data=True, save_datasets=True, save_example
             if lcategory["label"] == "Physics":
                 readme += Units().info(size="+1", code=True)
 
-            for k, d in DataParser.clean_datasets.items():
-                if d["category"] == lcategory["tag"]:
-                    readme += DataParser(**d).get_info(load_columns=load_data)
+            for d in datasets.get(lcategory["tag"], []):
+                readme += DataParser(**d).get_info(load_columns=load_data)
 
         return readme
 
@@ -124,9 +129,8 @@ def build_readme(category=None, load_data=True, save_datasets=True, save_example
             if category["label"] == "Physics":
                 ffile.write(Units().info(size="+1", code=True))
 
-            for k, d in DataParser.clean_datasets.items():
-                if d["category"] == category["tag"]:
-                    ffile.write(DataParser(**d).get_info(load_columns=load_data))
+            for d in datasets.get(category["tag"], []):
+                ffile.write(DataParser(**d).get_info(load_columns=load_data))
 
         raw_files = set()
         for k, d in DataParser.clean_datasets.items():
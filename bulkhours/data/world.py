@@ -1,40 +1,29 @@
 import numpy as np
 
 from .data_parser import DataParser
+from .geometry_store import GeometryStore
 
 
 def get_mapgeneric(df):
-    import geopandas as gpd
-
     if "continent" in df.columns:
         del df["continent"]
 
-    df["country"] = df["country"].str.replace("United States", "United States of America")
-    df["country"] = df["country"].str.replace("Democratic Republic of Congo", "Dem. Rep. Congo")
-
-    filepath = gpd.datasets.get_path("naturalearth_lowres")
-    world = gpd.read_file(filepath)
+    df["country"] = GeometryStore.normalize_countries(df["country"])
 
-    # world = gpd.read_file(gpd.datasets.get_path(""))
-
-    world = world[(world.pop_est > 0) & (world.name != "Antarctica")]
-    # world[world.continent == 'South America']
+    world = GeometryStore.get_world()
     return world.merge(df.set_index("country"), how="left", left_on="name", right_index=True)
 
 
 def geo_format(df, timeopt):
-    cont = DataParser.get_data_from_file("continent.tsv")
-    df = df.merge(cont, how="left", on="country")
-
-    df["country"] = df["country"].str.replace("United States", "United States of America")
-    df["country"] = df["country"].str.replace("Democratic Republic of Congo", "Dem. Rep. Congo")
+    df = df.merge(GeometryStore.get_continents(), how="left", on="country")
+    df["country"] = GeometryStore.normalize_countries(df["country"])
 
     if type(timeopt) == int:
         df = df[df["year"] <= timeopt]
-    if timeopt == "first":
-        df = df[df.groupby("country")["year"].rank(method="dense", ascending=True) == 1.0]
-    if timeopt == "last" or type(timeopt) == int:
-        df = df[df.groupby("country")["year"].rank(method="dense", ascending=False) == 1.0]
+    if timeopt in ["first", "last"] or type(timeopt) == int:
+        # Rows of the first (last) year of each country: one groupby pass, no ranking
+        years = df.groupby("country")["year"].transform("min" if timeopt == "first" else "max")
+        df = df[df["year"] == years]
     if timeopt:
         df = df.groupby(["country", "year"]).mean(numeric_only=True).reset_index()
 
@@ -1,15 +1,28 @@
-from .brownian import plot_brownian_sample  # noqa
-from .gallery import *  # noqa
-from . import regression  # noqa
-from . import gradient  # noqa
-from . import trading  # noqa
+from ..core import tools
 
-from .block import Block, BlockCoin, BlockMsg  # noqa
-from .blockchain import BlockChain  # noqa
+# gallery (statsmodels) and regression (sklearn) are imported at first access
+__getattr__, __dir__ = tools.lazy_loader(
+    __name__,
+    submodules=["brownian", "gallery", "regression", "gradient", "trading", "block", "blockchain"],
+    attributes={
+        "plot_brownian_sample": "brownian",
+        **{
+            k: "gallery"
+            for k in ["annotate", "get_x", "plot1", "plot2", "plot_celestine", "plot_gallery_r1", "plot_gallery_r3"]
+            + ["plot_gallery_skews", "plot_mean_median", "plot_sigma", "plot_skew", "plot_stationary", "set_title"]
+        },
+        **{k: "block" for k in ["Block", "BlockCoin", "BlockMsg"]},
+        "BlockChain": "blockchain",
+    },
+)
 
 
 def random(samples_number, sample_size, mu=4, distrib="bimodal", seed=42):
     """return a dataframe of exp(-X/scale)/scale for random X"""
+    import numpy as np
+    import pandas as pd
+    import scipy as sp
+
     np.random.seed(seed)
     if distrib == "exp":
         return pd.DataFrame(np.random.exponential(scale=mu, size=(sample_size, samples_number)))
@@ -1,5 +1,18 @@
-from .languages import get_languages_perf  # noqa
-from .git_graph import *  # noqa
-from .git_graphviz import *  # noqa
-from .ffiles import *  # noqa
-from .flops import *  # noqa
+from ..core import tools
+
+# flops (requests, bs4) and git_graph (graphviz) are imported at first access
+__getattr__, __dir__ = tools.lazy_loader(
+    __name__,
+    submodules=["compiler", "languages", "git_graph", "git_graphviz", "ffiles", "flops"],
+    attributes={
+        "get_languages_perf": "languages",
+        **{k: "git_graph" for k in ["get_git_graph", "get_nodes"]},
+        **{k: "git_graphviz" for k in ["Branch", "Node", "Nodes"]},
+        **{k: "ffiles" for k in ["generate_file_data", "generate_random_files", "get_random_filenames"]},
+        **{
+            k: "flops"
+            for k in ["FLOPS", "WikiPages", "get_engraving_scale", "get_html_object", "get_table_from_wiki"]
+            + ["get_tf_flops", "get_tf_model", "to_html"]
+        },
+    },
+)
@@ -1,27 +1,100 @@
+import io
+import os
+import time
 import pandas as pd  # library for data analysis
 import requests  # library to handle requests
 from bs4 import BeautifulSoup  # library to parse HTML documents
 
+from ..core import tools
+
+
+class WikiPages:
+    """Snapshots of the wikipedia pages in data/cache/wiki/, downloaded again (with a shared requests.Session)
+    after ttl seconds. Offline (BLK_OFFLINE=1), or when the download fails, the snapshot is used whatever its age.
+    """
+
+    directory, ttl, timeout, offline = None, 7 * 24 * 3600, 30, None
+    session, documents = None, {}
+
+    @staticmethod
+    def get_filename(url):
+        directory = WikiPages.directory or tools.abspath("data/cache/wiki/")
+        return os.path.join(directory, url.rstrip("/").split("/")[-1] + ".html")
+
+    @staticmethod
+    def is_offline():
+        if WikiPages.offline is not None:
+            return WikiPages.offline
+        return os.environ.get("BLK_OFFLINE", "0") not in ["", "0"]
+
+    @staticmethod
+    def get(url):
+        filename = WikiPages.get_filename(url)
+        if os.path.exists(filename) and (
+            WikiPages.is_offline() or time.time() - os.path.getmtime(filename) < WikiPages.ttl
+        ):
+            with open(filename, encoding="utf-8") as f:
+                return f.read()
+        if WikiPages.is_offline():
+            raise FileNotFoundError(f"No snapshot of {url} ({filename}) in offline mode")
+
+        if WikiPages.session is None:
+            WikiPages.session = requests.Session()
+            WikiPages.session.headers["User-Agent"] = "bulkhours (https://github.com/guydegnol/bulkhours)"
+        try:
+            response = WikiPages.session.get(url, timeout=WikiPages.timeout)
+            response.raise_for_status()
+        except requests.RequestException:
+            if not os.path.exists(filename):
+                raise
+            print(f"\x1b[31mCan't download {url}, the snapshot is used\x1b[0m")
+            with open(filename, encoding="utf-8") as f:
+                return f.read()
+
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(tmpname := f"{filename}.{os.getpid()}.tmp", "w", encoding="utf-8") as f:
+            f.write(response.text)
+        os.replace(tmpname, filename)
+        return response.text
+
+    @staticmethod
+    def get_document(url):
+        """lxml document of the page, parsed once per snapshot"""
+        import lxml.html
+
+        html = WikiPages.get(url)
+        stamp = os.path.getmtime(WikiPages.get_filename(url))
+        if url not in WikiPages.documents or WikiPages.documents[url][0] != stamp:
+            WikiPages.documents[url] = (stamp, lxml.html.fromstring(html))
+        return WikiPages.documents[url][1]
+
+    @staticmethod
+    def find_tables(url, in_table=None, sclass="wikitable"):
+        """Elements of class sclass containing the text in_table (xpath evaluated by lxml)"""
+        xpath = f"//table[contains(concat(' ', normalize-space(@class), ' '), ' {sclass} ')]"
+        if sclass != "wikitable":
+            xpath = f"//td[contains(@class, '{sclass}')]"
+        if in_table is None:
+            return WikiPages.get_document(url).xpath(xpath)
+        return WikiPages.get_document(url).xpath(f"{xpath}[contains(., $text)]", text=in_table)
+
+
+def to_html(element):
+    import lxml.html
+
+    return lxml.html.tostring(element, encoding="unicode")
+
 
 def get_html_object(wpage, in_table, wsite="https://en.wikipedia.org/wiki/", verbose=False, sclass="wikitable"):
     url = wsite + wpage
     print(f"""From {url}, getting data table whith string "{in_table}" in it""")
 
-    # Get the page in the form of html
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    my_tables = (
-        soup.find_all("table", {"class": "wikitable"})
-        if sclass == "wikitable"
-        else soup.find_all("td", {"class": "sidebar-content plainlist"})
-    )
-
-    for table in my_tables:
+    for table in WikiPages.find_tables(
+        url, in_table, sclass="wikitable" if sclass == "wikitable" else "sidebar-content"
+    ):
         if verbose:
-            print(f"# New table: \n {str(table)}")
-        if in_table in str(table):
-            return str(table)
+            print(f"# New table: \n {to_html(table)}")
+        return to_html(table)
 
 
 def get_engraving_scale(verbose=False):
@@ -47,38 +120,24 @@ def get_table_from_wiki(wpage, in_table, columns=None, wsite="https://en.wikiped
     url = wsite + wpage
 
     print(f"""From {url}, getting data table whith string "{in_table}" in it""")
-    # Get the page in the form of html
-    response = requests.get(url)
-
-    # Parse data from the html into a beautifulsoup object
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    my_tables = soup.find_all("table", {"class": "wikitable"})
-    for table in my_tables:
+    for table in WikiPages.find_tables(url, in_table):
         if verbose:
-            print(f"# New table: \n {str(table)}")
-        if in_table in str(table):
-            data = pd.DataFrame(pd.read_html(str(table))[0])
-            if columns is not None:
-                data.columns = columns
-            return data
+            print(f"# New table: \n {to_html(table)}")
+        data = pd.DataFrame(pd.read_html(io.StringIO(to_html(table)))[0])
+        if columns is not None:
+            data.columns = columns
+        return data
 
 
 class FLOPS:
     def __init__(self):
         print("""Data are https://en.wikipedia.org/wiki/FLOPS""")
-        # Get the page in the form of html
-        response = requests.get("https://en.wikipedia.org/wiki/FLOPS")
-
-        # Parse data from the html into a beautifulsoup object
-        soup = BeautifulSoup(response.text, "html.parser")
-        my_tables = soup.find_all("table", {"class": "wikitable"})
-        for table in my_tables:
-            if "wikitable floatright" in str(table):
-                self.units = pd.DataFrame(pd.read_html(str(table))[0])
+        for table in WikiPages.find_tables("https://en.wikipedia.org/wiki/FLOPS"):
+            if "floatright" in table.get("class", "").split():
+                self.units = pd.DataFrame(pd.read_html(io.StringIO(to_html(table)))[0])
             else:
                 # convert list to dataframe
-                costs = pd.DataFrame(pd.read_html(str(table))[0])
+                costs = pd.DataFrame(pd.read_html(io.StringIO(to_html(table)))[0])
                 costs.columns = ["date", "un_costs", "costs", "platform", "comments"]
                 self.costs = costs[["date", "costs"]]
 
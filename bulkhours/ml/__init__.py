@@ -1,5 +1,8 @@
 import numpy as np
-from . import lxmert  # noqa: F401
+from ..core import tools
+
+# lxmert (torch, cv2) is imported at first access
+__getattr__, __dir__ = tools.lazy_loader(__name__, submodules=["lxmert"])
 
 
 def linear_forward_test():
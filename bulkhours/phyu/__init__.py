@@ -1 +1,7 @@
-from .quantic import get_potential, get_pdf, get_spectrum
+from ..core import tools
+
+__getattr__, __dir__ = tools.lazy_loader(
+    __name__,
+    submodules=["quantic", "constants", "formulas"],
+    attributes={k: "quantic" for k in ["get_potential", "get_pdf", "get_spectrum"]},
+)
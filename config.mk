@@ -3,3 +3,4 @@ PROJECT_NAME=bulkhours
 SCRIPT:bulkhours-correct=bulkhours.core.evaluation:dump_corrections
 SCRIPT:bulkhours-boids=bulkhours.boids.simulation:main
 SCRIPT:bulkhours-git-push=bulkhours.core:git_push
+SCRIPT:bulkhours-build-bundle=bulkhours.data.embedded_bundle:build_bundle
@@ -45,6 +45,7 @@ setup(
     name=get_parameter(),
     version=get_version(),
     packages=find_packages(),
+    package_data={"bulkhours": ["data/embedded/*"]},
     author="Guillaume Therin",
     author_email="guillaume.therin@gmail.com",
     license="https://github.com/guydegnol/guydegnol-privacy/blob/main/privacy-policy.md",
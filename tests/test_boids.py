@@ -0,0 +1,157 @@
+import os
+import numpy as np
+import pytest
+from bulkhours.boids import neighbors
+from bulkhours.boids.flock import Flock
+
+
+def test_neighbors():
+    rng = np.random.default_rng(0)
+    positions = rng.integers(0, 500, size=(400, 2))
+    positions[1] = positions[0]  # Same position: still neighbors
+
+    distances = np.sqrt(((positions[:, None, :] - positions[None, :, :]) ** 2).sum(axis=2))
+    for radius in [20, 70]:
+        i, j = neighbors.get_pairs(positions, radius)
+        expected = np.argwhere((distances < radius) & ~np.eye(len(positions), dtype=bool))
+        assert len(i) == len(expected) and set(zip(i.tolist(), j.tolist())) == set(map(tuple, expected.tolist()))
+
+
+def test_flock_rules():
+    pygame = pytest.importorskip("pygame")
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    from bulkhours.boids.boid import Boid
+    from bulkhours.boids.obstacle import Obstacle
+
+    rng = np.random.default_rng(0)
+    positions, velocities = rng.integers(0, 300, size=(200, 2)), rng.normal(0, 3, size=(200, 2))
+    obstacles = [Obstacle(150, 150), Obstacle(40, 260)]
+    flock = Flock(positions, velocities, obstacle_avoidance_weight=15, field_of_view=70)
+    flock.steer(obstacles=[(o.rect.x, o.rect.y) for o in obstacles])
+
+    # Reference: the rules of the sprites, applied to the state of the flock at the beginning of the step
+    Boid.width, Boid.height = Flock.width, Flock.height
+    image = os.path.join(os.path.dirname(__file__), "..", "bulkhours", "boids", "boid.png")
+    boids = [Boid(int(x), int(y), 100, 40, 5, 15, 0, 70, 8, image) for x, y in positions]
+    for boid, (vx, vy) in zip(boids, velocities):
+        boid.velocityX, boid.velocityY = vx, vy
+    snapshot = [
+        type("Snapshot", (), dict(rect=b.rect.copy(), velocityX=b.velocityX, velocityY=b.velocityY)) for b in boids
+    ]
+
+    for k, boid in enumerate(boids):
+        closeboid = [s for i, s in enumerate(snapshot) if i != k and boid.distance(s) < boid.field_of_view]
+        boid.cohesion(closeboid)
+        boid.alignment(closeboid)
+        boid.separation(closeboid, 20)
+        for obstacle in obstacles:
+            if boid.distance(obstacle) <= boid.field_of_view:
+                boid.obstacle_avoidance(obstacle)
+        boid.go_to_middle()
+
+    pygame.display.quit()
+    assert np.allclose(flock.velocities, [(b.velocityX, b.velocityY) for b in boids])
+
+
+def test_flock_hunt():
+    rng = np.random.default_rng(0)
+    prey = Flock(rng.uniform(0, 500, size=(300, 2)), field_of_view=70, rng=rng)
+    predators = Flock(prey.positions[:3] + 1, goal_weight=50, field_of_view=70, rng=rng)
+
+    prey.step(predators)
+    assert predators.hunt(prey) > 0 and len(prey) < 300
+    assert (np.sqrt((prey.velocities**2).sum(axis=1)) <= prey.max_speed + 1e-9).all()
+
+    prey.remove(-1)
+    assert len(prey.positions) == len(prey.velocities)
+
+
+def test_simulation_step():
+    pytest.importorskip("pygame")
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from bulkhours.boids import simulation
+
+    fps = simulation.benchmark(sizes=(50,), steps=3)
+    assert fps[50] > 0
+
+
+def test_simulation_delete_keys():
+    pygame = pytest.importorskip("pygame")
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from bulkhours.boids import simulation
+
+    rendering = simulation.PyGameRendering()
+    rendering.add_boids("boid_list", 1)
+    rendering.boid_list.remove(0)
+    pygame.event.clear()  # Window events: get_event stops at the first event which is not a key
+    for key in [pygame.K_p, pygame.K_b, pygame.K_o]:  # No predator flock, empty boid flock, no obstacle
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0))
+    rendering.get_event()
+    assert rendering.predator_list is None and len(rendering.boid_list) == 0
+    rendering.quit()
+
+
+def test_headless_simulation(tmp_path):
+    import time
+    from bulkhours.boids.headless import HeadlessSimulation, load_trajectory
+
+    start = time.perf_counter()
+    trajectory = HeadlessSimulation(seed=3).run(1000, filename := str(tmp_path / "boids.npz"))
+    assert time.perf_counter() - start < 5  # No rendering nor frame rate limit
+
+    # Same seed, same trajectories
+    replayed = load_trajectory(filename)
+    assert replayed["boids"].shape == (1001, 70, 4) and replayed["predators"].dtype == np.float32
+    np.testing.assert_array_equal(replayed["boids"], trajectory["boids"])
+    np.testing.assert_array_equal(HeadlessSimulation(seed=3).run(1000)["boids"], trajectory["boids"])
+    assert not np.array_equal(HeadlessSimulation(seed=4).run(10)["boids"], trajectory["boids"][:11])
+
+    # Caught boids are NaN from their last step
+    caught = np.isnan(trajectory["boids"][:, :, 0])
+    assert (caught[:-1] <= caught[1:]).all()
+
+
+def test_pltboid_forces():
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from bulkhours.boids.pltboid import Boid, Boids, Simulation
+
+    np.random.seed(1)
+    boids = Boids(300)
+    population = [Boid(x.copy(), dx.copy()) for x, dx in zip(boids.x, boids.dx)]
+
+    # Same forces as the Boid methods (blind angles, 10 nearest neighbors)
+    forces = [b.separation(population) / 10 + b.align(population) / 8 + b.cohere(population) / 100 for b in population]
+    assert np.allclose(np.array(forces) - boids.x / 200, boids.forces())
+
+    fig, ax = plt.subplots()
+    simulation = Simulation(100, ax)
+    x = simulation.boids.x.copy()
+    assert len(simulation.iteration(0)) == 1 and not np.allclose(x, simulation.boids.x)
+    assert (np.abs(simulation.boids.x) <= Boid.taille + 20).all()
+    plt.close(fig)
+
+
+def test_pltboid_animation(tmp_path):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from bulkhours.boids.pltboid import Simulation
+
+    fig, ax = plt.subplots()
+    simulation = Simulation(200, ax)
+
+    # One collection, the markers are taken from the cache of rotated markers
+    paths = simulation.collection.get_paths()
+    assert len(paths) == 200 and all(any(p is m for m in simulation.markers) for p in paths)
+    np.testing.assert_array_equal(simulation.collection.get_offsets(), simulation.boids.x)
+
+    anim = simulation.animate(frames=5)
+    anim.save(tmp_path / "boids.gif", writer="pillow", fps=10)
+    assert (tmp_path / "boids.gif").stat().st_size > 0
+    plt.close(fig)
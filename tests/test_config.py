@@ -12,3 +12,31 @@ def test_config():
     print(config.subject)
     print(config.language)
     print(config.norm20)
+
+
+def test_config_cache():
+    config = bulkhours.get_config()
+    config.get("global", {})["language"] = "klingon"
+
+    assert bulkhours.get_config().get("global", {}).get("language") != "klingon"
+
+
+def test_config_cache_reload(tmp_path):
+    import os
+    import json
+    from bulkhours.core.tools import ConfigCache
+
+    filename = str(tmp_path / ".safe")
+    try:
+        with open(filename, "w") as f:
+            json.dump({"subject": "s1"}, f)
+        assert ConfigCache.read(filename)["subject"] == "s1"
+
+        # Rewritten by another kernel: same size, new mtime
+        with open(filename, "w") as f:
+            json.dump({"subject": "s2"}, f)
+        stat = os.stat(filename)
+        os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert ConfigCache.read(filename)["subject"] == "s2"
+    finally:
+        ConfigCache.stamp, ConfigCache.data = None, {}
@@ -1,3 +1,4 @@
+import pandas as pd
 import bulkhours
 
 
@@ -15,3 +16,157 @@ def test_train():
     test_set_x_orig = bulkhours.get_data("test_catvnoncat", key="test_set_x", credit=False)  # your test set features
     test_set_y_orig = bulkhours.get_data("test_catvnoncat", key="test_set_y", credit=False)  # your test set labels
     classes = bulkhours.get_data("test_catvnoncat", key="list_classes", credit=False)  # the list of classes
+
+
+def test_dataset_cache(tmp_path):
+    from bulkhours.data import DatasetCache
+
+    DatasetCache.directory = str(tmp_path)
+    DatasetCache.clear()
+    try:
+        df = bulkhours.get_data("unemployment", credit=False)
+        assert len(DatasetCache.data) == 1 and len(list(tmp_path.glob("*.parquet"))) == 1
+
+        # Copies: the cached dataset can't be modified by the caller
+        expected = df.copy()
+        df.iloc[0, 0] = "modified"
+        assert bulkhours.get_data("unemployment", credit=False).iloc[0, 0] != "modified"
+
+        # A new kernel reloads the parquet file
+        DatasetCache.clear()
+        pd.testing.assert_frame_equal(bulkhours.get_data("unemployment", credit=False), expected)
+
+        # use_cache=False bypasses the cache
+        DatasetCache.clear(disk=True)
+        pd.testing.assert_frame_equal(bulkhours.get_data("unemployment", credit=False, use_cache=False), expected)
+        assert len(DatasetCache.data) == 0 and len(list(tmp_path.glob("*.parquet"))) == 0
+
+        # The index freq and the attrs are restored from the parquet file
+        df = pd.DataFrame({"a": range(4)}, index=pd.date_range("2020", periods=4, freq="QS"))
+        df.attrs["unit"] = "m"
+        DatasetCache.put("freq", df)
+        DatasetCache.clear()
+        cached = DatasetCache.get("freq")
+        assert cached.index.freq == df.index.freq and cached.attrs == df.attrs
+    finally:
+        DatasetCache.directory = None
+        DatasetCache.clear()
+
+
+def test_csv_pushdown(tmp_path):
+    import tracemalloc
+    import numpy as np
+    from bulkhours.data.data_parser import read_csv_chunks, downcast_columns
+
+    countries = np.array(["France", "Germany", "Italy", "Spain"])[np.arange(200000) % 4]
+    df = pd.DataFrame(dict(country=countries, year=np.arange(200000) % 50 + 1970, value=np.random.rand(200000)))
+    df.to_csv(filename := tmp_path / "big.csv", index=False)
+
+    def get_peak(f):
+        tracemalloc.start()
+        result = f()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return result, peak
+
+    query = "country == 'France' and year >= 2015"
+    full, full_peak = get_peak(lambda: pd.read_csv(filename).query(query))
+    streamed, streamed_peak = get_peak(
+        lambda: downcast_columns(read_csv_chunks(filename, 20000, query, True, usecols=["country", "value", "year"]))
+    )
+
+    assert len(streamed) == len(full) and streamed["country"].dtype == "category"
+    assert streamed["value"].dtype == np.float32 and np.allclose(streamed["value"], full["value"])
+    assert (streamed.index == full.index).all()
+    assert streamed_peak < full_peak / 2
+    print(f"Peak memory: {full_peak / 1e6:.1f} MB (full read) vs {streamed_peak / 1e6:.1f} MB (pushdown)")
+
+
+def test_h5_array(tmp_path, monkeypatch):
+    import os
+    import h5py
+    import numpy as np
+    from bulkhours.data import H5Array, H5Files
+
+    monkeypatch.setattr(H5Array, "directory", str(tmp_path / "memmaps"))
+    images = np.random.randint(0, 255, size=(50, 8, 8, 3), dtype=np.uint8)
+    with h5py.File(filename := str(tmp_path / "images.h5"), "w") as f:
+        f["train_set_x"] = images
+
+    array = H5Array(filename, "train_set_x")
+    assert array.shape == images.shape and len(array) == 50 and (array[10:20, 0] == images[10:20, 0]).all()
+    assert (np.concatenate(list(array.iter_batches(16))) == images).all() and (np.asarray(array) == images).all()
+
+    memmap = array.to_memmap()
+    assert isinstance(memmap, np.memmap) and (memmap == images).all() and not memmap.flags.writeable
+    assert memmap.filename.startswith(str(tmp_path / "memmaps")) and len(os.listdir(tmp_path)) == 2  # Not near the h5
+    assert (array.to_memmap(npyname := str(tmp_path / "images.npy")) == images).all() and os.path.exists(npyname)
+
+    H5Files.close()
+    assert len(H5Files.files) == 0 and (array[-1] == images[-1]).all() and len(H5Files.files) == 1
+    H5Files.close()
+
+
+def test_geo_format():
+    import time
+    from bulkhours.data.world import geo_format
+
+    def geo_format_reference(df, timeopt):
+        cont = bulkhours.DataParser.get_data_from_file("continent.tsv")
+        df = df.merge(cont, how="left", on="country")
+        df["country"] = df["country"].replace({"United States": "United States of America"})
+        df["country"] = df["country"].replace({"Democratic Republic of Congo": "Dem. Rep. Congo"})
+
+        if type(timeopt) == int:
+            df = df[df["year"] <= timeopt]
+        if timeopt == "first":
+            df = df[df.groupby("country")["year"].rank(method="dense", ascending=True) == 1.0]
+        if timeopt == "last" or type(timeopt) == int:
+            df = df[df.groupby("country")["year"].rank(method="dense", ascending=False) == 1.0]
+        if timeopt:
+            df = df.groupby(["country", "year"]).mean(numeric_only=True).reset_index()
+        return df
+
+    df = bulkhours.DataParser.get_data_from_file("climate-change.csv")
+    df = pd.concat([df] * 20, ignore_index=True).rename(columns={"Entity": "country", "Year": "year"})
+
+    for timeopt in [None, "first", "last", 2000]:
+        start = time.time()
+        expected = geo_format_reference(df.copy(), timeopt)
+        middle = time.time()
+        pd.testing.assert_frame_equal(geo_format(df.copy(), timeopt), expected)
+        print(f"geo_format({timeopt}): {middle - start:.3f}s (rank) vs {time.time() - middle:.3f}s")
+
+
+def test_embedded_bundle():
+    from bulkhours.data import EmbeddedBundle
+
+    bulkhours.DataParser.build_clean_datasets()
+    assert len(EmbeddedBundle.get_index()) > 0
+    for label, info in EmbeddedBundle.get_index().items():
+        data = bulkhours.DataParser(**bulkhours.DataParser.clean_datasets[label])
+        assert data.get_info_key() == info["key"], f"{label} changed: run bulkhours-build-bundle"
+        pd.testing.assert_frame_equal(data.get_data(credit=False), data.get_data(credit=False, use_cache=False))
+
+
+def test_dataset_catalog(tmp_path, monkeypatch):
+    from bulkhours.data import DatasetCatalog, DataParser
+
+    DatasetCatalog.directory, DatasetCatalog.entries = str(tmp_path), None
+    try:
+        DataParser.build_clean_datasets()
+        data = DataParser(**DataParser.clean_datasets["unemployment"])
+        info = data.get_info()  # Loaded once, as show_credit and help
+        columns = list(bulkhours.get_data("unemployment", credit=False).columns)
+        assert f"| {columns[-1]} |" in info and (tmp_path / "index.json").exists()
+
+        # A new kernel renders the index without loading the dataset
+        DatasetCatalog.entries = None
+        monkeypatch.setattr(DataParser, "get_data", lambda *args, **kwargs: 1 / 0)
+        assert data.get_info() == info and data.get_info(load_columns=True) == info
+
+        # A modified source is loaded again
+        monkeypatch.setattr(bulkhours.data.data_parser, "get_fingerprint", lambda *args, **kwargs: "new")
+        assert "| Column" not in data.get_info()
+    finally:
+        DatasetCatalog.directory, DatasetCatalog.entries = None, None
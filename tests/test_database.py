@@ -0,0 +1,53 @@
+from bulkhours.core.db_log import AppendLog
+
+
+def test_append_log(tmp_path):
+    filename = str(tmp_path / "course.json")
+    writer, reader = AppendLog(filename, max_records=3), AppendLog(filename)
+
+    for i in range(4):
+        writer.append("set", "s_room1_n_ex1", f"user{i}", {"note": i})
+    writer.append("update", "s_room1_n_ex1", "user1", {"note": 10})
+    writer.append("delete", "s_room1_n_ex1", "user2")
+
+    assert reader.load() == {"s_room1_n_ex1": {"user0": {"note": 0}, "user1": {"note": 10}, "user3": {"note": 3}}}
+
+
+def test_sqlite_client(tmp_path):
+    from bulkhours.core.db_sqlite import SqliteClient
+
+    collection = SqliteClient(str(tmp_path / "course.sqlite")).collection("s_room1_n_ex1")
+    collection.document("user1").set({"note": 5, "update_time": "2023-09-01 10:00:00"})
+    collection.document("user1").update({"note": 8})
+
+    batch = collection.client.batch()
+    batch.set(collection.document("user2"), {"note": 3})
+    batch.delete(collection.document("user1"))
+    batch.commit()
+
+    assert {d.id: d.to_dict() for d in collection.stream()} == {"user2": {"note": 3}}
+    assert collection.document("user1").get().to_dict() == {}
+
+
+def test_append_log_lock(tmp_path):
+    import threading
+    from bulkhours.core import db_log
+
+    if db_log.fcntl is None:
+        return
+    writer, reader = AppendLog(filename := str(tmp_path / "course.json"), max_records=2), AppendLog(filename)
+    writer.append("set", "s_room1_n_ex1", "user0", {"note": 0})
+    reader.load()
+    for i in range(1, 4):  # Compaction, then the log grows past the reader offset
+        writer.append("set", "s_room1_n_ex1", f"user{i}", {"note": i})
+
+    # A reader waits for the end of a write
+    with open(filename + ".log", "ab") as log_file:
+        writer.lock(log_file)
+        thread = threading.Thread(target=reader.load)
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive()
+        writer.lock(log_file, unlock=True)
+    thread.join()
+    assert reader.data == writer.data and len(reader.data["s_room1_n_ex1"]) == 4
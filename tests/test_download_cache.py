@@ -0,0 +1,87 @@
+import threading
+import http.server
+import pandas as pd
+
+from bulkhours.data.download_cache import DownloadCache
+from bulkhours.data.data_parser import get_data_from_file, DataParser
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    files, etags, requests = {}, {}, []
+
+    def do_GET(self):
+        Handler.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.path not in Handler.files:
+            return self.send_error(404)
+
+        if self.headers.get("If-None-Match") == (etag := Handler.etags[self.path]):
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(Handler.files[self.path])))
+        self.end_headers()
+        self.wfile.write(Handler.files[self.path])
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(files):
+    Handler.files, Handler.requests = files, []
+    Handler.etags = {k: f'"{hash(v)}"' for k, v in files.items()}
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_download_cache(tmp_path):
+    server, url = start_server({"/a.csv": b"x,y\n1,2\n", "/b.csv": b"x\n" + b"3\n" * 100})
+    try:
+        # The directory is created by the first download only
+        assert DownloadCache(directory=str(tmp_path / "new")).get_metadata(url) == {}
+        assert not (tmp_path / "new").exists()
+
+        cache = DownloadCache(directory=str(tmp_path), max_age=3600)
+
+        # Miss then hit without any request
+        filename = cache.get(url + "/a.csv")
+        assert filename.endswith(".csv") and open(filename, "rb").read() == b"x,y\n1,2\n"
+        assert cache.get(url + "/a.csv") == filename and len(Handler.requests) == 1
+
+        # Revalidation: 304 then a new version of the file
+        cache.max_age = 0
+        assert cache.get(url + "/a.csv") == filename and Handler.requests[-1][1] == Handler.etags["/a.csv"]
+        Handler.files["/a.csv"], Handler.etags["/a.csv"] = b"x,y\n5,6\n", '"v2"'
+        assert open(cache.get(url + "/a.csv"), "rb").read() == b"x,y\n5,6\n"
+        assert len(Handler.requests) == 3
+
+        # HTTP error: the stale file is used
+        Handler.files.pop("/a.csv")
+        assert open(cache.get(url + "/a.csv"), "rb").read() == b"x,y\n5,6\n" and len(Handler.requests) == 4
+        Handler.files["/a.csv"] = b"x,y\n5,6\n"
+
+        # Offline: only the cached files
+        offline = DownloadCache(directory=str(tmp_path), max_age=0, offline=True)
+        assert offline.get(url + "/a.csv") == filename and offline.get(url + "/b.csv") is None
+        assert len(Handler.requests) == 4
+
+        # Least recently used files are evicted
+        cache.max_size = 205
+        cache.get(url + "/b.csv")
+        assert offline.get(url + "/a.csv") is None and offline.get(url + "/b.csv") is not None
+
+        DownloadCache.directory = str(tmp_path)
+        assert get_data_from_file(url + "/b.csv").shape == (100, 1)
+
+        # Multi-file datasets: the parts are fetched concurrently
+        cache.max_size, Handler.files["/c.csv"], Handler.etags["/c.csv"] = 10**6, b"y\n4\n", '"c"'
+        df = DataParser(label="ac", raw_data=[url + "/a.csv", url + "/c.csv"]).read_raw_data(
+            [url + "/a.csv", url + "/c.csv"]
+        )
+        assert list(df.columns) == ["x", "y", "y"] and df.iloc[0].tolist() == [5, 6, 4]
+    finally:
+        DownloadCache.directory = None
+        server.shutdown()
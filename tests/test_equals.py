@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+import bulkhours
+
+
+def test_is_equal():
+    data = np.linspace(0, 1, 200000)
+    assert bulkhours.is_equal(data, data.copy()) == 10
+    assert bulkhours.is_equal(data, data + 1.0) == 0
+    assert bulkhours.is_equal(data, data + 1.0, norm="L2-norm", policy="gaussian", error=1e3) == 9
+
+    df = pd.DataFrame({"a": data, "b": data})
+    assert bulkhours.is_equal(df, df + 1e-10) == 10
+    series = pd.Series([np.nan, 1.0, 2.0])
+    assert bulkhours.is_equal(series, series.copy()) == 10
+    assert bulkhours.is_equal(series, series.copy(), norm="L1-norm") == 10
+    assert bulkhours.is_equal(series, series + 1.0) == 0
+
+    assert bulkhours.is_equal("Hello world", "Hello world !", similarity="ngram", policy="gaussian", error=1) > 9
+
+
+def test_is_equal_many():
+    scores = bulkhours.is_equal_many([np.array([1.0, 2.0]), np.array([1.0, 3.0]), [1.0, 2.0]], np.array([1.0, 2.0]))
+    assert list(scores) == [10, 0, 0]
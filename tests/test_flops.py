@@ -1,22 +1,73 @@
+import os
+import pytest
+import requests
 import pandas as pd
 import bulkhours
+from bulkhours.hpc.flops import WikiPages
+
+
+@pytest.fixture(autouse=True)
+def wiki_snapshots():
+    # Recorded pages (tests/fixtures/wiki): no network
+    WikiPages.directory, WikiPages.offline = os.path.join(os.path.dirname(__file__), "fixtures", "wiki"), True
+    yield
+    WikiPages.directory, WikiPages.offline, WikiPages.documents = None, None, {}
 
 
 def test_engraving_scale():
     scales = bulkhours.get_data("hpc.engraving_scale")
+    assert scales.iloc[0].tolist() == ["1971", 10000] and scales["scale"].iloc[-1] == 3
 
 
 def test_transistor_count():
     scales = bulkhours.get_data("hpc.transistor_count")
+    assert scales["processor"].tolist() == ["µPD7220 GDC", "Voodoo Graphics", "GeForce 256", "GA100 Ampere"]
 
 
 def test_FLOPS_units():
     scales = bulkhours.get_data("hpc.FLOPS_units")
+    assert scales["Name"].tolist()[:2] == ["kiloFLOPS", "megaFLOPS"]
 
 
 def test_FLOPS_gpus():
     scales = bulkhours.get_data("hpc.FLOPS_gpus")
+    assert list(scales.columns) == ["date", "un_costs", "costs", "platform", "comments"] and len(scales) == 5
 
 
 def test_FLOPS_cpus():
     scales = bulkhours.get_data("hpc.FLOPS_cpus")
+    assert len(scales) == 9 and scales["count"].tolist()[:3] == [74442, 2250, 3500]
+    assert pd.isna(scales["engraving_scale"].iloc[0]) and scales["engraving_scale"].iloc[1] == 10000
+
+
+def test_FLOPS():
+    flops = bulkhours.hpc.FLOPS()
+    assert len(flops.get_flop_factor()) == 6 and flops.get_costs()["date"].iloc[-1] == 2017
+
+
+def test_wiki_snapshots(tmp_path):
+    class Session:
+        calls = 0
+
+        def get(self, url, timeout=None):
+            Session.calls += 1
+            return type(
+                "Response", (), dict(text=f"<html>{Session.calls}</html>", raise_for_status=lambda self: None)
+            )()
+
+    WikiPages.directory, WikiPages.offline, WikiPages.session = str(tmp_path), False, Session()
+    try:
+        url = "https://en.wikipedia.org/wiki/Test"
+        assert WikiPages.get(url) == "<html>1</html>" and WikiPages.get(url) == "<html>1</html>"
+        WikiPages.ttl = 0
+        assert WikiPages.get(url) == "<html>2</html>" and os.path.exists(tmp_path / "Test.html")
+
+        # Failed download: the stale snapshot is returned as is
+        def fail(url, timeout=None):
+            raise requests.ConnectionError(url)
+
+        stamp = os.path.getmtime(tmp_path / "Test.html")
+        WikiPages.session.get = fail
+        assert WikiPages.get(url) == "<html>2</html>" and os.path.getmtime(tmp_path / "Test.html") == stamp
+    finally:
+        WikiPages.session, WikiPages.ttl = None, 7 * 24 * 3600
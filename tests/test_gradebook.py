@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from bulkhours import core
+from bulkhours.admin.exercice import Exercices
+from bulkhours.admin.gradebook import Gradebook
+
+
+def test_gradebook(tmp_path, monkeypatch):
+    if not Gradebook.is_available():
+        pytest.skip("No pyarrow")
+    monkeypatch.setattr(core.tools, "abspath", lambda filename, **kwargs: str(tmp_path / filename.split("/")[-1]))
+
+    config = dict(virtual_room="room1", subject="s", notebook_id="n", **{"global": {}})
+    answers = {
+        "ex1": {
+            "a@b.c": {"note": 5, "update_time": "2023-09-01 10:00:00"},
+            "d@e.f": {"note": None, "update_time": "2023-09-01 10:05:00"},  # Failure of automatic grades
+        },
+        "ex2": {"a@b.c": {"note": 0, "update_time": "2023-09-01 10:00:00"}},
+    }
+    gradebook = Gradebook(config)
+    for exo, adata in answers.items():
+        gradebook.update(exo, adata)
+    answers["ex1"]["a@b.c"]["note"] = 7.5  # New note of ex1: its rows are replaced
+    gradebook.update("ex1", answers["ex1"])
+
+    table = Gradebook(config).load(exos=["ex1", "ex2"])
+    assert gradebook.exists() and len(table) == 3 and Gradebook(config).load(exos=["ex2"])["user"].tolist() == ["a@b.c"]
+
+    # Same summary table as the one built from the answers
+    users, exos = ["a@b.c", "d@e.f", "g@h.i"], ["ex1", "ex2"]
+    exercices = Exercices(users, exos, {"evaluation": ""}, config)
+    exercices.update_table(table)
+    reference = Exercices(users, exos, {"evaluation": ""}, config)
+    for exo, adata in answers.items():
+        for user, data in adata.items():
+            reference.update_data(user, exo, data)
+
+    for field in ["count", "note"]:  # As in summary(cinfo="A")
+        values, expected = (e.get_dataframe(field, suffix="." + field[0]) for e in [exercices, reference])
+        pd.testing.assert_frame_equal(values, expected, check_dtype=False)
+    notes = exercices.get_dataframe("note")
+    assert notes.loc["a@b.c"].tolist() == [7.5, 0.0, 7.5] and notes.loc["d@e.f", "ex1"] == -2
+    assert np.isnan(notes.loc["g@h.i", "ex1"]) and notes["all"].tolist() == [7.5, 0.0, 0.0]
+
+
+def test_get_answers(tmp_path, monkeypatch):
+    import argparse
+    from bulkhours.admin import answers
+    from bulkhours.core.db_sqlite import SqliteClient
+
+    config = dict(subject="s", virtual_room="room1", notebook_id="n", **{"global": {"language": "en"}})
+    monkeypatch.setattr(
+        core.tools, "get_config", lambda is_namespace=False: argparse.Namespace(**config) if is_namespace else config
+    )
+    monkeypatch.setattr(core.tools, "abspath", lambda filename, **kwargs: str(tmp_path / filename.split("/")[-1]))
+    monkeypatch.setattr(answers.tools, "get_users_list", lambda no_admin=True: pd.DataFrame({"mail": ["a", "b", "c"]}))
+    monkeypatch.setattr(Gradebook, "is_available", staticmethod(lambda: False))
+    monkeypatch.setattr(answers.tools, "update_github", lambda *args, **kwargs: None)  # Writes git_push.sh
+    monkeypatch.setattr(
+        core.firebase.DbDocument, "data_base_client", client := SqliteClient(str(tmp_path / "db.sqlite"))
+    )
+    collection = client.collection("s_room1_n_ex1")
+
+    collection.document("a").set({"note": 1, "update_time": "2999-01-01 00:00:00"})  # Clock of the student ahead
+    assert answers.get_answers("ex1", incremental=True)["a"]["note"] == 1
+
+    # A document stamped before the one of the student ahead is still fetched
+    collection.document("b").set({"note": 2, "update_time": core.firebase.get_update_time()})
+    answers.update_note("ex1", "a", 5, verbose=False)
+    cdata = answers.get_answers("ex1", incremental=True)
+    assert {user: data["note"] for user, data in cdata.items()} == {"a": 5, "b": 2}
+    assert collection.document("a").get().to_dict()["update_time"] < "2999"  # Note updates bump update_time
+
+    # refresh=True (default) is still a full synchronisation
+    collection.document("b").delete()
+    assert list(answers.get_answers("ex1", incremental=True)) == ["a", "b"] and list(answers.get_answers("ex1")) == [
+        "a"
+    ]
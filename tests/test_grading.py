@@ -0,0 +1,93 @@
+import argparse
+import pytest
+from IPython.core.interactiveshell import InteractiveShell
+from bulkhours.core.cell_parser import CellParser
+from bulkhours.core import grading
+
+cinfo = argparse.Namespace(cell_id="grading_test", type="code")
+
+
+def get_cell(source, user):
+    return CellParser(cinfo=cinfo, parse_cell=True, cell_source=source, user=user, source="")
+
+
+@pytest.fixture
+def teacher_data():
+    InteractiveShell.instance().run_cell("import bulkhours")
+    source = """result = 2 * 3
+%time copy = result
+!true
+
+def student_evaluation_function():
+    return bulkhours.is_equal(student.result, max_score=10)
+"""
+    return get_cell(source, "solution")
+
+
+@pytest.fixture
+def students_data():
+    sources = dict(good="result = 6\n", magic="%time result = 2 * 3\n!true\n", wrong="result = 5\n")
+    return {user: get_cell(source, user) for user, source in dict(sources, error="result = 1 / 0\n").items()}
+
+
+def test_process_grader(teacher_data, students_data):
+    if not grading.ProcessGrader.is_available():
+        pytest.skip("No fork")
+
+    grader = grading.BatchGrader(teacher_data)
+    scores = grader.evaluate_all(students_data)
+    assert grader.max_score == 10 and scores == dict(good=10, magic=10, wrong=0, error=None)
+
+    grader = grading.ProcessGrader(teacher_data, processes=2)
+    assert grader.max_score == 10 and grader.evaluate_all(students_data) == scores
+
+
+def test_batch_grader(teacher_data, students_data, tmp_path, monkeypatch):
+    from bulkhours import admin, core
+    from bulkhours.core.db_sqlite import SqliteBatch, SqliteClient
+
+    contexts, build_context = [], grading.contexts.build_context
+    monkeypatch.setattr(
+        grading.contexts,
+        "build_context",
+        lambda data, *args, **kwargs: contexts.append(args[1]) or build_context(data, *args, **kwargs),
+    )
+    notes = grading.BatchGrader(teacher_data).evaluate_all(students_data)
+    assert notes == dict(good=10, magic=10, wrong=0, error=None)  # None: failing evaluation
+    assert contexts.count("teacher") == 1 and contexts.count("student") == len(students_data)
+
+    # All the notes in a single write
+    config = dict(subject="s", virtual_room="room1", notebook_id="n", **{"global": {"language": "en"}})
+    monkeypatch.setattr(
+        core.tools, "get_config", lambda is_namespace=False: argparse.Namespace(**config) if is_namespace else config
+    )
+    monkeypatch.setattr(core.tools, "abspath", lambda filename, **kwargs: str(tmp_path / filename.split("/")[-1]))
+    monkeypatch.setattr(
+        core.firebase.DbDocument, "data_base_client", client := SqliteClient(str(tmp_path / "db.sqlite"))
+    )
+    commits, commit = [], SqliteBatch.commit
+    monkeypatch.setattr(SqliteBatch, "commit", lambda self: commits.append(self) or commit(self))
+
+    admin.answers.update_notes("grading_test", notes, verbose=False)
+    documents = client.collection("s_room1_n_grading_test").stream()
+    assert len(commits) == 1 and {document.id: document.to_dict()["note"] for document in documents} == notes
+
+
+def test_cell_decomposition(teacher_data):
+    code = teacher_data.get_code("main_execution")
+    teacher_data.minfo["main_execution"]["code"] = "modified = True\n"  # As WidgetScript.fix_woptions
+    assert teacher_data.get_code("main_execution") == code
+
+    # Only the parsed code is shared: the line options depend on the config
+    assert all(cinfo.cell_id not in decomposition for decomposition in CellParser.decompositions.values())
+
+
+def test_process_grader_memory_limit(teacher_data):
+    if not grading.ProcessGrader.is_available() or grading.resource is None:
+        pytest.skip("No fork or no memory limit")
+
+    # The limit is on top of the memory of the kernel (IPython, numpy, pandas...)
+    sources = dict(modest="buffer = bytearray(2**26)\nresult = 6\n", greedy="result = bytearray(2**32)\n")
+    students_data = {user: get_cell(source, user) for user, source in sources.items()}
+    grader = grading.ProcessGrader(teacher_data, processes=2, memory_limit=256 * 1024**2)
+    assert grader.evaluate_all(students_data) == dict(modest=10, greedy=None)
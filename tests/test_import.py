@@ -0,0 +1,48 @@
+import os
+import sys
+import inspect
+import importlib
+import subprocess
+import pytest
+import bulkhours  # noqa: F401
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_import_times(module="bulkhours"):
+    """Cumulated import time (s) of each module loaded by a cold import"""
+    env = {**os.environ, "PYTHONPATH": root_dir}
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], env=env, capture_output=True, text=True
+    ).stderr
+
+    times = {}
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:") :].split("|")
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def test_import_bulkhours():
+    times = get_import_times()
+
+    for module in ["torch", "cv2", "statsmodels", "sklearn", "pygame", "bs4", "graphviz", "tensorflow"]:
+        assert module not in times, f"{module} is imported by 'import bulkhours'"
+    assert times["bulkhours"] < 3.0
+
+
+@pytest.mark.parametrize(
+    "package, submodule",
+    [("hpc", "git_graph"), ("hpc", "git_graphviz"), ("hpc", "ffiles"), ("hpc", "flops"), ("ecox", "gallery")],
+)
+def test_lazy_attributes(package, submodule):
+    """The lazy attributes of a package cover the public names of the submodules it used to star-import"""
+    package = importlib.import_module(f"bulkhours.{package}")
+    try:
+        module = importlib.import_module(f"{package.__name__}.{submodule}")
+    except ImportError as e:
+        pytest.skip(str(e))
+
+    names = {k for k, v in vars(module).items() if not k.startswith("_") and inspect.getmodule(v) is module}
+    assert names <= set(dir(package)) and all(getattr(package, k) is getattr(module, k) for k in names)